@@ -0,0 +1,3 @@
+"""
+Benchmarks for PSUP, run them from the repository's root, eg: ``python -m benchmarks.sessions``.
+"""
@@ -0,0 +1,47 @@
+"""
+Load test made of recorded sessions.
+
+Plays every recording (see :func:`psup.replay.record`) in a folder again as fast as possible and
+reports the sessions and steps per second, recordings of the same story share its script.
+
+    python -m benchmarks.replay recordings/
+"""
+
+from argparse import ArgumentParser
+from glob import glob
+from os.path import join
+from time import perf_counter
+from typing import Dict
+
+from psup import Script, Story
+from psup.replay import corpus, replay
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Replays a corpus of recorded sessions")
+    parser.add_argument("folder", help="The folder with the recordings (*.jsonl)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    recordings = corpus(sorted(glob(join(args.folder, "*.jsonl"))))
+    scripts: Dict[str, Script] = dict()
+    for recording in recordings:
+        if recording.reference not in scripts:
+            scripts[recording.reference] = Story._load_script(recording.reference)
+
+    inputs = sum(len(i.inputs) for i in recordings) * args.repeat
+    start = perf_counter()
+    for _ in range(args.repeat):
+        for recording in recordings:
+            replay(scripts[recording.reference], recording)
+    elapsed = perf_counter() - start
+    sessions = len(recordings) * args.repeat
+    print(f"sessions:           {sessions}")
+    print(f"inputs:             {inputs}")
+    print(f"time:               {elapsed:.3f}s")
+    print(f"sessions/s:         {sessions / elapsed:,.0f}")
+    print(f"inputs/s:           {inputs / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Load benchmark for :class:`psup.server.StoryServer`.
+
+Connects thousands of simulated players over localhost, every one answering each prompt as soon as
+it arrives (options at random, the play again question with no), then reports the sessions and
+steps per second and the latency percentiles of the answers. The server runs in the same process
+unless ``--host`` and ``--port`` point to one that's already running.
+
+    python -m benchmarks.server --story atlas/rps.sus --players 2000
+"""
+
+from argparse import ArgumentParser
+from asyncio import Semaphore, gather, open_connection, run
+from random import Random
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+from psup import Script
+from psup.server import StoryServer
+
+
+def percentile(values: List[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+async def player(
+    host: str,
+    port: int,
+    seed: int,
+    max_steps: int,
+    connecting: Semaphore,
+    latencies: List[float],
+) -> int:
+    async with connecting:  # Not flooding the listen backlog.
+        reader, writer = await open_connection(host, port)
+    rng = Random(seed)
+    options = 0
+    steps = 0
+    sent = perf_counter()
+    waiting = True  # Connecting isn't counted as latency.
+    try:
+        while steps < max_steps:
+            line = (await reader.readline()).decode("UTF-8")
+            if not line:
+                break
+            if not waiting:
+                latencies.append(perf_counter() - sent)
+                waiting = True
+            if line[:1].isdigit() and ") " in line:
+                options += 1
+            elif "play again" in line:
+                options = -1
+            elif line == "> \n":
+                answer = (
+                    "n"
+                    if options < 0
+                    else str(rng.randint(1, options)) if options else ""
+                )
+                options = 0
+                steps += 1
+                sent, waiting = perf_counter(), False
+                writer.write(f"{answer}\n".encode("UTF-8"))
+    finally:
+        writer.close()
+    return steps
+
+
+async def main() -> None:
+    parser = ArgumentParser(description="StoryServer load benchmark")
+    parser.add_argument("--story", default="atlas/rps.sus")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--max-steps", type=int, default=100)
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+
+    server: Optional[StoryServer] = None
+    address: Tuple[str, int]
+    if args.port is None:
+        server = StoryServer(Script.from_file(args.story), "127.0.0.1")
+        await server.start()
+        address = server.address
+    else:
+        address = (args.host or "127.0.0.1", args.port)
+
+    latencies: List[float] = []
+    connecting = Semaphore(256)
+    start = perf_counter()
+    try:
+        steps = await gather(
+            *[
+                player(*address, i, args.max_steps, connecting, latencies)
+                for i in range(args.players)
+            ]
+        )
+    finally:
+        if server is not None:
+            await server.close()
+    wall = perf_counter() - start
+    print(f"players:            {args.players}")
+    print(f"steps:              {sum(steps)}")
+    print(f"wall time:          {wall:.3f}s")
+    print(f"sessions/s:         {args.players / wall:,.0f}")
+    print(f"steps/s:            {sum(steps) / wall:,.0f}")
+    for p in (50, 90, 99, 99.9):
+        print(f"answer latency p{p:<5} {percentile(latencies, p) * 1e6:,.0f}us")
+
+
+if __name__ == "__main__":
+    run(main())
@@ -0,0 +1,84 @@
+"""
+Load benchmark for :class:`psup.SessionManager`.
+
+Runs many sessions of a story on one event loop (so one core), answering every message as soon as
+it arrives, then reports the sessions per second per core and the per-step latency percentiles.
+
+    python -m benchmarks.sessions --story atlas/rps.sus --sessions 5000
+"""
+
+from argparse import ArgumentParser
+from asyncio import gather, run
+from random import Random
+from time import perf_counter, process_time
+from typing import List
+
+from psup import Script, SessionManager, Story
+
+
+def percentile(values: List[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+async def play(
+    manager: SessionManager,
+    key: int,
+    script: Script,
+    max_steps: int,
+    latencies: List[float],
+) -> int:
+    session = await manager.start(key, Story(script))
+    rng = Random(key)
+    steps = 0
+    sent = perf_counter()
+    while steps < max_steps:
+        message = await session.receive()
+        latencies.append(perf_counter() - sent)
+        if message is None:
+            break
+        if message.error is not None:
+            continue
+        if message.options is not None:
+            answer = str(rng.randint(1, len(message.options)))
+        elif message.text is not None and "play again" in message.text:
+            answer = "n"
+        else:
+            answer = ""
+        steps += 1
+        sent = perf_counter()
+        await session.send(answer)
+    session.cancel()
+    return steps
+
+
+async def main() -> None:
+    parser = ArgumentParser(description="SessionManager load benchmark")
+    parser.add_argument("--story", default="atlas/rps.sus")
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--max-running", type=int, default=None)
+    args = parser.parse_args()
+
+    script = Script.from_file(args.story)
+    latencies: List[float] = []
+    start, start_cpu = perf_counter(), process_time()
+    async with SessionManager(max_sessions=args.max_running) as manager:
+        steps = await gather(
+            *[
+                play(manager, i, script, args.max_steps, latencies)
+                for i in range(args.sessions)
+            ]
+        )
+    wall, cpu = perf_counter() - start, process_time() - start_cpu
+    print(f"sessions:           {args.sessions}")
+    print(f"steps:              {sum(steps)}")
+    print(f"wall time:          {wall:.3f}s")
+    print(f"sessions/s/core:    {args.sessions / cpu:,.0f}")
+    print(f"steps/s/core:       {sum(steps) / cpu:,.0f}")
+    for p in (50, 90, 99, 99.9):
+        print(f"step latency p{p:<5} {percentile(latencies, p) * 1e6:,.0f}us")
+
+
+if __name__ == "__main__":
+    run(main())
@@ -0,0 +1,237 @@
+"""
+Benchmark suite for parsing, stepping and the memory used by sessions.
+
+Parses the atlas and synthetic scripts of 1k to 1M lines, steps stories with text, OPTION and
+UTILS heavy workloads under a scripted I/O function and measures the memory each session takes.
+The results can be saved as a baseline and later runs compared to it, exiting with 1 if anything
+got worse by more than the threshold.
+
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+"""
+
+import gc
+import json
+import platform
+import tracemalloc
+from argparse import ArgumentParser
+from asyncio import run
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import psup
+from psup import Script, Story, compiler, expressions
+
+ATLAS = Path(__file__).resolve().parent.parent / "atlas"
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+Results = Dict[str, Dict[str, Any]]
+
+
+def text_section(i: int, count: int) -> str:
+    return (
+        f"[STORY s{i}]\n"
+        f"- TAG t{i}\n"
+        f"Line of narrative number {i}.\n"
+        f"- STORAGE SET n{i % 10} {i}\n"
+        f"You have {{{{STORAGE GET n{i % 10}}}}} coins.{{{{NEWLINE}}}}\n"
+        f"- CHECKATTR a{i % 5} $$SKIP 1\n"
+        f"- ADDATTR a{i % 5}\n"
+        "Some more narrative.\n"
+        "And even more narrative.\n"
+        f"- UTILS IS STORAGE GET n{i % 10}, {i} $$SKIP 1\n"
+        "This line is skipped.\n"
+    )
+
+
+def option_section(i: int, count: int) -> str:
+    return (
+        f"[STORY s{i}]\n"
+        f"- TAG t{i}\n"
+        "Where to?\n"
+        f"- OPTION left $$STORY s{(i + 1) % count}, right $$SKIP 1, stay $$STAY, back $$JUMP t{max(0, i - 1)}\n"
+        "You went right.\n"
+        f"- OPTION a $$CHECKATTR x $$SKIP 1, b $$ADDATTR x, c $$RANDOM STAY, SKIP 1\n"
+        "Onwards.\n"
+        "- OPTION yes $$STAY, no $$STAY\n"
+        "Again.\n"
+        "- OPTION one $$STAY, two $$STAY, three $$STAY, four $$STAY\n"
+    )
+
+
+def utils_section(i: int, count: int) -> str:
+    return (
+        f"[STORY s{i}]\n"
+        "- STORAGE SET x $$UTILS ADD STORAGE GET x, 1\n"
+        "- STORAGE SET y $$UTILS MULT STORAGE GET x, 2\n"
+        "- UTILS GREATER STORAGE GET y, 100 $$STORAGE SET x 0\n"
+        "- UTILS IS STORAGE GET x, 0 $$STORAGE SET y 1\n"
+        "- STORAGE SET z $$UTILS SUB STORAGE GET y, STORAGE GET x\n"
+        "- UTILS ISNOT STORAGE GET z, 3 $$SKIP 1\n"
+        "z is three.\n"
+        "x: {{STORAGE GET x}} y: {{STORAGE GET y}} z: {{UTILS ADD STORAGE GET z, 1}}\n"
+        "- STORAGE SET r $$UTILS RAND 1, 6\n"
+        "- UTILS SMALLER STORAGE GET r, 3 $$SKIP 1\n"
+    )
+
+
+WORKLOADS: Dict[str, Callable[[int, int], str]] = {
+    "text": text_section,
+    "option": option_section,
+    "utils": utils_section,
+}
+
+
+def synthetic(lines: int, workload: str = "text") -> str:
+    """Makes a script of (about) the given amount of lines, every section is 10 lines long."""
+    section, count = WORKLOADS[workload], max(1, lines // 10)
+    return "".join(section(i, count) for i in range(count))
+
+
+def clear_caches() -> None:
+    # The compiler and expressions cache what they parse, parsing the same text twice would be free.
+    for module in (compiler, expressions):
+        for value in vars(module).values():
+            cache_clear = getattr(value, "cache_clear", None)
+            if cache_clear is not None:
+                cache_clear()
+
+
+def best_of(repeat: int, function: Callable[[], Any]) -> float:
+    # Like timeit, the garbage collector is off while timing so it doesn't add noise.
+    times = []
+    for _ in range(repeat):
+        clear_caches()
+        gc.collect()
+        gc.disable()
+        try:
+            start = perf_counter()
+            function()
+            times.append(perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+class BenchIO:
+    """Answers every option at random and the end prompt with yes so the story never stops."""
+
+    def __init__(self, seed: int = 0) -> None:
+        self.rng = Random(seed)
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        if "options" in kwargs:
+            return str(self.rng.randint(1, len(list(kwargs["options"]))))
+        if text is not None and text.endswith("\n> "):
+            return "y"
+        return ""
+
+
+async def steps(story: Story, amount: int) -> None:
+    for _ in range(amount):
+        ret = story._step()
+        if ret is not None:
+            await ret
+
+
+def bench_parse(results: Results, sizes: Iterable[int], repeat: int) -> None:
+    atlas = [i.read_text(encoding="UTF-8") for i in sorted(ATLAS.glob("*.sus"))]
+    atlas_lines = sum(i.count("\n") + 1 for i in atlas)
+    elapsed = best_of(repeat, lambda: [Script(i) for i in atlas])
+    add(results, "parse/atlas", atlas_lines / elapsed, "lines/s")
+    for size in sizes:
+        source = synthetic(size)
+        elapsed = best_of(repeat if size < 100_000 else 1, lambda: Script(source))
+        add(results, f"parse/{size}", size / elapsed, "lines/s")
+
+
+def bench_steps(results: Results, amount: int, repeat: int) -> None:
+    for workload in WORKLOADS:
+        script = Script(synthetic(1_000, workload))
+
+        def play() -> None:
+            story = Story(script, BenchIO())
+            story.rng = Random(0)
+            run(steps(story, amount))
+
+        add(results, f"steps/{workload}", amount / best_of(repeat, play), "steps/s")
+
+
+def bench_memory(results: Results, sessions: int) -> None:
+    script = Script(synthetic(1_000))
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        stories = [Story(script, BenchIO(i)) for i in range(sessions)]
+
+        async def advance() -> None:
+            for story in stories:
+                await steps(story, 20)
+
+        run(advance())
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    add(results, "memory/session", used / sessions, "bytes", higher_is_better=False)
+
+
+def add(
+    results: Results, name: str, value: float, unit: str, higher_is_better: bool = True
+) -> None:
+    results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+    print(f"{name:<20}{value:>16,.0f} {unit}")
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> bool:
+    """Prints the change of every result from the baseline, returns whether none regressed."""
+    ok = True
+    print(f"\n{'benchmark':<20}{'baseline':>16}{'current':>16}{'change':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        change = (new - old) / old if old else 0.0
+        worse = -change if result["higher_is_better"] else change
+        mark = ""
+        if worse > threshold:
+            mark, ok = "  REGRESSION", False
+        print(f"{name:<20}{old:>16,.0f}{new:>16,.0f}{change:>+10.1%}{mark}")
+    return ok
+
+
+def main() -> None:
+    parser = ArgumentParser(description="PSUP benchmark suite")
+    parser.add_argument("--sizes", type=lambda s: [int(i) for i in s.split(",")], default=SIZES)
+    parser.add_argument("--quick", action="store_true", help="Skip the scripts above 10k lines")
+    parser.add_argument("--steps", type=int, default=50_000)
+    parser.add_argument("--sessions", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    sizes = [i for i in args.sizes if not args.quick or i <= 10_000]
+    results: Results = dict()
+    bench_parse(results, sizes, args.repeat)
+    bench_steps(results, args.steps, args.repeat)
+    bench_memory(results, args.sessions)
+
+    if args.save is not None:
+        data = {
+            "psup": psup.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.save.write_text(json.dumps(data, indent=2) + "\n", encoding="UTF-8")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="UTF-8"))["results"]
+        if not compare(results, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
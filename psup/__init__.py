@@ -39,8 +39,30 @@ __license__ = "MIT"
 __copyright__ = "Copyright (c) 2021-present EnokiUN"
 __version__ = "1.0.0-rc1"
 
+from .backends import CaptureIO, NullIO, PagedIO, ScriptedIO, TerminalIO
+from .catalog import Catalog
 from .errors import StoryError
 from .onlinestory import OnlineStory
+from .script import LazyScript, Script
+from .session import QueueIO, SessionManager, StorySession
+from .storage import Attributes, Storage
 from .story import Story
 
-__all__ = ["Story", "StoryError", "OnlineStory"]
+__all__ = [
+    "Story",
+    "StoryError",
+    "OnlineStory",
+    "Script",
+    "Catalog",
+    "LazyScript",
+    "SessionManager",
+    "StorySession",
+    "QueueIO",
+    "TerminalIO",
+    "NullIO",
+    "ScriptedIO",
+    "CaptureIO",
+    "PagedIO",
+    "Attributes",
+    "Storage",
+]
@@ -22,10 +22,21 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from argparse import ArgumentParser
+from asyncio import run
 from os import name, system
+from sys import exit, stderr, stdout
+from typing import List
 
+from .analysis import analyze
+from .backends import CaptureIO, NullIO, ScriptedIO, TerminalIO
 from .onlinestory import OnlineStory
-from .story import Story
+from .profiler import Profiler
+from .replay import Recording, record, replay
+from .simulator import simulate
+from .story import IoFunction, Story
+
+# The answers -io null gives before stopping, a story can loop on its first option forever.
+_NULL_ANSWERS = 10_000
 
 
 def main() -> None:
@@ -45,16 +56,150 @@ def main() -> None:
         default=False,
         help="(Optional) Tries to fetch the story from the github page",
     )
+    parser.add_argument(
+        "-rate",
+        dest="rate",
+        type=float,
+        default=200.0,
+        help="(Optional) The typewriter speed in characters per second, 0 disables it",
+    )
+    parser.add_argument(
+        "-inputs",
+        dest="inputs",
+        type=str,
+        default=None,
+        help="(Optional) A file with the answers to use instead of asking for them, one per line",
+    )
+    parser.add_argument(
+        "-io",
+        dest="io",
+        type=str,
+        choices=("terminal", "null", "capture"),
+        default="terminal",
+        help="(Optional) Where the output goes: the terminal, nowhere (null) or all at once after the story ends (capture)",
+    )
+    parser.add_argument(
+        "-simulate",
+        dest="simulate",
+        type=int,
+        default=None,
+        metavar="RUNS",
+        help="(Optional) Plays the story the given amount of times without a player and reports the results",
+    )
+    parser.add_argument(
+        "-check",
+        dest="check",
+        action="store_const",
+        const=True,
+        default=False,
+        help="(Optional) Checks the story for broken jumps, dead Sub-stories and endless loops without running it",
+    )
+    parser.add_argument(
+        "-profile",
+        dest="profile",
+        action="store_const",
+        const=True,
+        default=False,
+        help="(Optional) Shows where the time went after the story ends",
+    )
+    parser.add_argument(
+        "-record",
+        dest="record",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="(Optional) Records the answers and random choices to a file so the session can be replayed",
+    )
+    parser.add_argument(
+        "-replay",
+        dest="replay",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="(Optional) Replays a recorded session and then continues it",
+    )
+    parser.add_argument(
+        "-serve",
+        dest="serve",
+        type=str,
+        default=None,
+        metavar="[HOST:]PORT",
+        help="(Optional) Serves the story to remote players over TCP, one story per connection",
+    )
     args = parser.parse_args()
+    if args.record is not None and args.replay is not None:
+        parser.error("-record and -replay can't be used together")
+    if args.io == "null" and args.inputs is not None:
+        parser.error("-inputs can't be used with -io null")
+    if args.io == "capture" and args.inputs is None:
+        parser.error("-io capture needs the answers from -inputs")
     online = args.online
     storyname = args.story
+    if args.check:
+        story_class = OnlineStory if online else Story
+        script = story_class._load_script(story_class._resolve_reference(storyname))
+        analysis = analyze(script)
+        print(analysis)
+        exit(0 if analysis.ok else 1)
+    if args.serve is not None:
+        from .server import StoryServer  # Only needed here, keeping the CLI's imports light.
+
+        story_class = OnlineStory if online else Story
+        script = story_class._load_script(story_class._resolve_reference(storyname))
+        host, _, port = args.serve.rpartition(":")
+        server = StoryServer(script, host or None, int(port), story_class=story_class)
+        try:
+            run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.simulate is not None:
+        story_class = OnlineStory if online else Story
+        script = story_class._load_script(story_class._resolve_reference(storyname))
+        print(simulate(script, runs=args.simulate))
+        return
+    inputs: List[str] = []
+    if args.inputs is not None:
+        with open(args.inputs, "r", encoding="UTF-8") as f:
+            inputs = f.read().splitlines()
+    io: IoFunction
+    if args.io == "null":
+        io = NullIO(_NULL_ANSWERS)
+    elif args.io == "capture":
+        io = CaptureIO(inputs)
+    elif args.inputs is not None:
+        io = ScriptedIO(inputs, stdout)
+    else:
+        io = TerminalIO(args.rate or None)
     # easy
-    if online:
-        story = OnlineStory(storyname)
+    story_class = OnlineStory if online else Story
+    story: Story
+    if args.replay is not None:
+        script = story_class._load_script(story_class._resolve_reference(storyname))
+        recording = Recording.load(args.replay)
+        story = replay(script, recording, stream=stdout, story_class=story_class)
+        story.io = io
     else:
-        story = Story(storyname)
-    system("cls" if name == "nt" else "clear")
-    story.start()
+        story = story_class(storyname, io)
+    if args.record is not None:
+        record(story, path=args.record)
+    if args.io == "terminal" and args.inputs is None and args.replay is None:
+        system("cls" if name == "nt" else "clear")
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+        profiler.attach(story)
+    try:
+        story.start()
+    except EOFError as e:
+        # Ran out of answers, eg: a story looping forever under -io null.
+        print(f"Stopped: {e}", file=stderr)
+        exit(1)
+    finally:
+        if isinstance(io, CaptureIO):
+            print(io.transcript)
+        if profiler is not None:
+            print(profiler.report(), file=stderr)
 
 
 if __name__ == "__main__":
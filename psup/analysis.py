@@ -0,0 +1,289 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import List, NamedTuple, Set, Tuple
+
+from .compiler import (
+    Call,
+    Command,
+    parse_attribute_check,
+    parse_call,
+    parse_choices,
+    parse_options,
+)
+from .errors import StoryError
+from .expressions import parse_utils
+from .script import Script
+
+# Functions which just go to the next line.
+_PLAIN_FUNCTIONS = {
+    "STAY",
+    "TAG",
+    "ADDATTR",
+    "DELATTR",
+    "NEWLINE",
+}
+_CONDITIONAL_UTILS = {"IS", "ISNOT", "GREATER", "SMALLER"}
+
+
+class Issue(NamedTuple):
+    """A problem found by :func:`analyze`.
+
+    .. versionadded:: 1.0.0
+    """
+
+    sub_story: str
+    line: int
+    message: str
+
+
+class _Flow:
+    # Where a line can go, filled in by _follow.
+
+    __slots__ = ("falls", "targets", "exits")
+
+    def __init__(self) -> None:
+        self.falls = False
+        self.targets: List[int] = list()
+        self.exits = False
+
+
+class Analysis:
+    """The results of :func:`analyze`.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    script: :class:`Script`
+            The analyzed script.
+    dangling: List[:class:`Issue`]
+            ``JUMP`` and ``STORY`` functions whose Tag or Sub-story doesn't exist.
+    unknown: List[:class:`Issue`]
+            Functions that aren't built in, these are either custom functions or typos and their
+            lines are assumed to just go to the next line.
+    dead: List[:class:`str`]
+            The Sub-stories that can never be reached.
+    traps: List[Tuple[:class:`str`, :class:`int`]]
+            The lines that can be reached but after which the story can never end, they're always
+            part of a loop with no way out.
+    reachable: Set[Tuple[:class:`str`, :class:`int`]]
+            Every line that can be reached.
+    """
+
+    def __init__(self, script: Script) -> None:
+        self.script = script
+        self.dangling: List[Issue] = list()
+        self.unknown: List[Issue] = list()
+        self.dead: List[str] = list()
+        self.traps: List[Tuple[str, int]] = list()
+        self.reachable: Set[Tuple[str, int]] = set()
+
+    @property
+    def ok(self) -> bool:
+        """Whether no dangling targets, dead Sub-stories or traps were found."""
+        return not (self.dangling or self.dead or self.traps)
+
+    def __str__(self) -> str:
+        lines = [f"Reachable lines: {len(self.reachable)}/{self.script.length}"]
+        for title, issues in (
+            ("Dangling targets", self.dangling),
+            ("Unknown functions", self.unknown),
+        ):
+            if issues:
+                lines.append(f"{title}:")
+                lines.extend(f"  {i.sub_story}:{i.line} {i.message}" for i in issues)
+        if self.dead:
+            lines.append("Dead Sub-stories:")
+            lines.extend(f"  {i}" for i in self.dead)
+        if self.traps:
+            lines.append("Lines in loops with no exit:")
+            lines.extend(f"  {name}:{line}" for name, line in self.traps)
+        return "\n".join(lines)
+
+
+def analyze(script: Script) -> Analysis:
+    """Checks a script for broken targets, dead Sub-stories and loops with no exit without running it.
+
+    .. versionadded:: 1.0.0
+
+    Every line is a node of a graph whose edges are the lines it can go to, including every branch
+    of ``OPTION``, ``CHECKATTR``, ``CHECKANYATTR``, ``RANDOM`` and the ``UTILS`` comparisons.
+    It takes time linear to the script's size.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import Script
+            from psup.analysis import analyze
+
+            analysis = analyze(Script.from_file("story.sus"))
+            if not analysis.ok:
+                print(analysis)
+    """
+    analysis = Analysis(script)
+    length = script.length
+    names: List[str] = list()
+    lines: List[int] = list()
+    edges: List[List[int]] = list()
+    exits: List[int] = list()
+    for name, code in script.code.items():
+        for line, instruction in enumerate(code):
+            offset = len(names)
+            names.append(name)
+            lines.append(line)
+            if not isinstance(instruction, Command) and offset + 1 < length:
+                edges.append([offset + 1])  # Text just goes to the next line.
+                continue
+            flow = _Flow()
+            if isinstance(instruction, Command):
+                _follow(analysis, script, flow, instruction.call, name, line, offset)
+            else:
+                flow.falls = True
+            if flow.falls:
+                if offset + 1 < length:
+                    flow.targets.append(offset + 1)
+                else:
+                    flow.exits = True
+            if flow.exits:
+                exits.append(offset)
+            edges.append(flow.targets)
+    if not length:
+        return analysis
+
+    # Finding every line that can be reached from the start.
+    start = script.offsets[script.first]
+    reached = [False] * length
+    reached[start] = True
+    stack = [start]
+    while stack:
+        for target in edges[stack.pop()]:
+            if not reached[target]:
+                reached[target] = True
+                stack.append(target)
+
+    # Finding every line that can reach an exit by going backwards from them.
+    incoming: List[List[int]] = [[] for _ in range(length)]
+    for offset, targets in enumerate(edges):
+        for target in targets:
+            incoming[target].append(offset)
+    escapes = [False] * length
+    for offset in exits:
+        escapes[offset] = True
+    stack = list(exits)
+    while stack:
+        for source in incoming[stack.pop()]:
+            if not escapes[source]:
+                escapes[source] = True
+                stack.append(source)
+
+    live_sub_stories = set()
+    for offset in range(length):
+        if reached[offset]:
+            analysis.reachable.add((names[offset], lines[offset]))
+            live_sub_stories.add(names[offset])
+            if not escapes[offset]:
+                analysis.traps.append((names[offset], lines[offset]))
+    analysis.dead = [
+        i for i in script.code if i not in live_sub_stories and script.code[i]
+    ]
+    return analysis
+
+
+def _follow(
+    analysis: Analysis,
+    script: Script,
+    flow: _Flow,
+    call: Call,
+    name: str,
+    line: int,
+    offset: int,
+) -> None:
+    # Adds where a function call can go to the flow of its line.
+    function, args = call.name, call.args or ""
+    if function in _PLAIN_FUNCTIONS:
+        flow.falls = True
+    elif function == "END":
+        flow.exits = True
+    elif function == "JUMP":
+        tag = script.tags.get(args.strip())
+        if tag is None:
+            analysis.dangling.append(
+                Issue(name, line, f"Tag {args.strip()} doesn't exist.")
+            )
+        else:
+            flow.targets.append(script.offsets[tag[0]] + tag[1])
+    elif function == "STORY":
+        if args.strip() not in script.code:
+            analysis.dangling.append(
+                Issue(name, line, f"Sub-story {args.strip()} doesn't exist.")
+            )
+        elif script.code[args.strip()]:
+            flow.targets.append(script.offsets[args.strip()])
+    elif function == "SKIP":
+        if args.strip().isdigit():
+            target = offset + int(args.strip()) + 1
+            if target < script.length:
+                flow.targets.append(target)
+            else:
+                flow.exits = True
+    elif function == "RETURN":
+        if args.strip().isdigit():
+            flow.targets.append(script.offsets[name] + max(0, line - int(args.strip())))
+    elif function == "OPTION":
+        for i in parse_options(args).calls:
+            _follow(analysis, script, flow, i, name, line, offset)
+    elif function == "RANDOM":
+        for i in parse_choices(args):
+            _follow(analysis, script, flow, i, name, line, offset)
+    elif function in ("CHECKATTR", "CHECKANYATTR"):
+        flow.falls = True
+        if "$$" in args:
+            _follow(
+                analysis,
+                script,
+                flow,
+                parse_attribute_check(args).call,
+                name,
+                line,
+                offset,
+            )
+    elif function == "STORAGE":
+        flow.falls = True
+        value = args.split(" ", 2)[-1]
+        if args.startswith("SET ") and value.startswith("$$"):
+            _follow(analysis, script, flow, parse_call(value[2:]), name, line, offset)
+    elif function == "UTILS":
+        flow.falls = True
+        sub_function, _, rest = args.partition(" ")
+        if sub_function in _CONDITIONAL_UTILS and "$$" in rest:
+            try:
+                check = parse_utils(sub_function, rest)
+            except StoryError:
+                return  # It'll fail when it's ran.
+            _follow(analysis, script, flow, check.call, name, line, offset)
+    else:
+        analysis.unknown.append(Issue(name, line, f"Unknown function: {function}"))
+        flow.falls = True
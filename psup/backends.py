@@ -0,0 +1,264 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import sys
+from asyncio import sleep
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, TextIO
+
+
+def _format(text: Optional[str], **kwargs: Any) -> str:
+    # The text the terminal shows for an I/O call.
+    if "options" in kwargs:
+        return "Choose one:\n" + "\n".join(
+            [f"{x+1}) {i}" for x, i in enumerate(kwargs["options"])]
+        )
+    return text if text is not None else ""
+
+
+def expects_answer(text: Optional[str] = None, **kwargs: Any) -> bool:
+    """Whether the :class:`Story` object uses the answer of an I/O call.
+
+    .. versionadded:: 1.0.0
+
+    That's the case for options and prompts (``UTILS INPUT`` and the play again question) which
+    always end with ``"\\n> "``, the answers to plain story lines are ignored.
+    """
+    return "options" in kwargs or (
+        text is not None and "error" not in kwargs and text.endswith("\n> ")
+    )
+
+
+class TerminalIO:
+    """The default I/O (input and output) function for the :class:`Story` class.
+
+    .. versionadded:: 1.0.0
+
+    Text is written with a typewriter effect in small batches instead of one character at a time,
+    set ``rate`` to ``None`` (or ``0``) to write everything at once.
+
+    Parameters
+    -----------
+    rate: Optional[:class:`float`]
+            The amount of characters written per second.
+    fps: :class:`float`
+            The amount of batches written per second.
+    stream: Optional[TextIO]
+            The stream to write to, defaults to :data:`sys.stdout`.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 200.0,
+        fps: float = 60.0,
+        stream: Optional[TextIO] = None,
+    ) -> None:
+        self.rate = rate
+        self.fps = fps
+        self.stream = stream
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        stream = self.stream or sys.stdout
+        if "error" in kwargs:
+            print(kwargs["error"], file=stream)
+            return ""
+        await self.write(_format(text, **kwargs), stream)
+        if "options" in kwargs:
+            stream.write("\n> ")
+            stream.flush()
+        return input()
+
+    async def write(self, text: str, stream: Optional[TextIO] = None) -> None:
+        """Writes text to the stream with the typewriter effect."""
+        stream = stream or self.stream or sys.stdout
+        if not self.rate:
+            stream.write(text)
+            stream.flush()
+            return
+        size = max(1, round(self.rate / self.fps))
+        for i in range(0, len(text), size):
+            stream.write(text[i : i + size])
+            stream.flush()
+            await sleep(size / self.rate)
+
+
+class NullIO:
+    """An I/O function that ignores the output and always chooses the first option.
+
+    .. versionadded:: 1.0.0
+
+    Parameters
+    -----------
+    max_answers: Optional[:class:`int`]
+            The maximum amount of options and prompts to answer, a story that loops on its first
+            option never ends otherwise.
+
+    Raises
+    -----------
+    EOFError
+            When the story asks for more than ``max_answers`` answers, same as :class:`ScriptedIO`.
+    """
+
+    def __init__(self, max_answers: Optional[int] = None) -> None:
+        self.max_answers = max_answers
+        self.answers = 0
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        if not expects_answer(text, **kwargs):
+            return ""
+        if self.max_answers is not None and self.answers >= self.max_answers:
+            raise EOFError(f"Answered {self.answers} times without the story ending")
+        self.answers += 1
+        return "1" if "options" in kwargs else ""
+
+
+class ScriptedIO:
+    """An I/O function that answers with a list of predefined inputs.
+
+    .. versionadded:: 1.0.0
+
+    Parameters
+    -----------
+    inputs: Iterable[:class:`str`]
+            The answers, one per option or prompt, see :func:`expects_answer`.
+    stream: Optional[TextIO]
+            A stream to write the output to without any typewriter effect, by default the
+            output is ignored.
+
+    Raises
+    -----------
+    EOFError
+            When the story asks for more inputs than there are, same as :func:`input`.
+    """
+
+    def __init__(self, inputs: Iterable[str], stream: Optional[TextIO] = None) -> None:
+        self.inputs: Iterator[str] = iter(inputs)
+        self.stream = stream
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        if "error" in kwargs:
+            self.output(kwargs["error"])
+            return ""
+        self.output(_format(text, **kwargs))
+        if not expects_answer(text, **kwargs):
+            return ""
+        try:
+            return next(self.inputs)
+        except StopIteration:
+            raise EOFError("Ran out of scripted inputs") from None
+
+    def output(self, text: str) -> None:
+        """Called with every piece of output text."""
+        if self.stream is not None:
+            self.stream.write(text + "\n")
+
+
+class CaptureIO(ScriptedIO):
+    """A :class:`ScriptedIO` that keeps the output instead of writing it.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    captured: List[:class:`str`]
+            Every piece of output text in order.
+    """
+
+    def __init__(self, inputs: Iterable[str] = ()) -> None:
+        super().__init__(inputs)
+        self.captured: List[str] = list()
+
+    def output(self, text: str) -> None:
+        self.captured.append(text)
+
+    @property
+    def transcript(self) -> str:
+        """All the captured output joined by newlines."""
+        return "\n".join(self.captured)
+
+
+class PagedIO:
+    """An I/O function that joins the story lines before a prompt into pages.
+
+    .. versionadded:: 1.0.0
+
+    Story lines (including ``UTILS SAY``) are kept until the story expects an answer, shows an error
+    or the page is full, then they're sent to the wrapped I/O function in a single call joined by
+    newlines. A 30 line passage before an ``OPTION`` becomes two calls (the page and the options)
+    instead of 31, which is what chat platforms with rate limits need.
+
+    Parameters
+    -----------
+    io: Callable[..., Awaitable[:class:`str`]]
+            The I/O function the pages and prompts are sent to.
+    max_lines: Optional[:class:`int`]
+            The maximum amount of lines in a page.
+    max_chars: Optional[:class:`int`]
+            The maximum length of a page, lines longer than it are sent on their own.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import PagedIO, Story
+
+            async def send(text=None, **kwargs):
+                ...  # Send the message to the chat, wait for the answer if there's options.
+
+            story = Story("story.sus", PagedIO(send, max_chars=2000))
+    """
+
+    def __init__(
+        self,
+        io: Callable[..., Awaitable[str]],
+        max_lines: Optional[int] = None,
+        max_chars: Optional[int] = 2000,
+    ) -> None:
+        self.io = io
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self._page: List[str] = list()
+        self._size = 0
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        if text is not None and not kwargs and not expects_answer(text):
+            lines, chars = self.max_lines, self.max_chars
+            if (lines is not None and len(self._page) >= lines) or (
+                chars is not None and self._size + len(text) > chars
+            ):
+                await self.flush()
+            self._page.append(text)
+            self._size += len(text) + 1
+            return ""
+        await self.flush()
+        return await self.io(text, **kwargs)
+
+    async def flush(self) -> None:
+        """Sends the lines that are kept, the story does it before every prompt so this is only
+        needed if it can end without asking anything (eg: a custom end function)."""
+        if not self._page:
+            return
+        page = "\n".join(self._page)
+        self._page.clear()
+        self._size = 0
+        await self.io(page)
@@ -0,0 +1,161 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from hashlib import sha256
+from os import environ, makedirs, replace, stat, unlink
+from os.path import abspath, basename, dirname, join
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from struct import Struct, error as StructError
+from tempfile import NamedTemporaryFile
+from typing import Optional, Tuple
+
+from .script import Script
+
+# Bumped whenever the layout of the compiled script changes so old caches get ignored.
+CACHE_FORMAT = 5
+CACHE_FOLDER = "__psupcache__"
+_MAGIC = b"PSUPC"
+# magic, format, source mtime (ns), source size, source sha256.
+_HEADER = Struct(f"<{len(_MAGIC)}sHqQ32s")
+
+
+def cache_enabled() -> bool:
+    """Whether caching is enabled by default.
+
+    .. versionadded:: 1.0.0
+
+    The cache is off unless the ``PSUP_CACHE`` or ``PSUP_CACHE_DIR`` environment variable is set.
+    """
+    return bool(environ.get("PSUP_CACHE") or environ.get("PSUP_CACHE_DIR"))
+
+
+def cache_path(path: str, cache_dir: Optional[str] = None) -> str:
+    """Gets the path a sus file's cache is stored in.
+
+    .. versionadded:: 1.0.0
+
+    By default that's a ``__psupcache__`` folder next to the sus file, if a ``cache_dir`` is given
+    (or the ``PSUP_CACHE_DIR`` environment variable is set) the caches of every file are stored there
+    instead with a hash of their path added to the name to tell them apart.
+    """
+    cache_dir = cache_dir or environ.get("PSUP_CACHE_DIR")
+    if not cache_dir:
+        return join(dirname(path), CACHE_FOLDER, basename(path) + "c")
+    key = sha256(abspath(path).encode("UTF-8")).hexdigest()[:16]
+    return join(cache_dir, f"{basename(path)}.{key}.susc")
+
+
+def load_script(
+    path: str, cache: Optional[bool] = None, cache_dir: Optional[str] = None
+) -> Script:
+    """Loads a sus file, using its cached compiled form when it's still valid.
+
+    .. versionadded:: 1.0.0
+
+    The cache is checked against the file's modification time and size first and if those changed
+    against the hash of its content, so touching a file doesn't make it get parsed again.
+    Any problem with reading or writing the cache just falls back to parsing the file.
+
+    .. warning::
+        Caches are unpickled, only point ``cache_dir`` to a folder you trust, same as ``__pycache__``.
+
+    Parameters
+    -----------
+    path: :class:`str`
+            The path of the sus file.
+    cache: Optional[:class:`bool`]
+            Whether to use the cache, defaults to :func:`cache_enabled`.
+    cache_dir: Optional[:class:`str`]
+            The folder to store the cache in, see :func:`cache_path`.
+    """
+    if cache is None:
+        cache = cache_enabled()
+    if not cache:
+        return Script.from_file(path)
+    source_stat = stat(path)
+    cached_path = cache_path(path, cache_dir)
+    header: Optional[Tuple[bytes, int, int, int, bytes]] = None
+    try:
+        with open(cached_path, "rb") as cf:
+            data = cf.read()
+        header = _HEADER.unpack_from(data)
+    except (OSError, ValueError, StructError):
+        pass
+    else:
+        if header[:2] == (_MAGIC, CACHE_FORMAT) and header[2:4] == (
+            source_stat.st_mtime_ns,
+            source_stat.st_size,
+        ):
+            script = _loads(data)
+            if script is not None:
+                return script
+    with open(path, "rb") as sf:
+        raw = sf.read()
+    digest = sha256(raw).digest()
+    script = None
+    if (
+        header is not None
+        and header[:2] == (_MAGIC, CACHE_FORMAT)
+        and header[4] == digest
+    ):
+        # Only the modification time changed.
+        script = _loads(data)
+    if script is None:
+        # Decoding with universal newlines, same as Script.from_file reading in text mode.
+        script = Script(
+            raw.decode("UTF-8").replace("\r\n", "\n").replace("\r", "\n"), path
+        )
+    _write(
+        cached_path,
+        _HEADER.pack(
+            _MAGIC, CACHE_FORMAT, source_stat.st_mtime_ns, source_stat.st_size, digest
+        )
+        + dumps(script, HIGHEST_PROTOCOL),
+    )
+    return script
+
+
+def _loads(data: bytes) -> Optional[Script]:
+    try:
+        script = loads(data[_HEADER.size :])
+    except Exception:
+        return None
+    return script if isinstance(script, Script) else None
+
+
+def _write(path: str, data: bytes) -> None:
+    try:
+        makedirs(dirname(path) or ".", exist_ok=True)
+        # Writing to a temporary file first so other processes never read a half written cache.
+        with NamedTemporaryFile("wb", dir=dirname(path) or ".", delete=False) as tf:
+            tf.write(data)
+    except OSError:
+        return
+    try:
+        replace(tf.name, path)
+    except OSError:
+        try:
+            unlink(tf.name)
+        except OSError:
+            pass
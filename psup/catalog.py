@@ -0,0 +1,204 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from asyncio import get_running_loop
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Type, TypeVar, Union
+
+from .analysis import analyze
+from .cache import load_script
+from .errors import StoryError
+from .script import Script
+from .story import IoFunction, Story, _story_io
+
+StoryT = TypeVar("StoryT", bound=Story)
+# The path, the script or the error that stopped it from loading and the analysis warnings.
+_Result = Tuple[str, Optional[Script], Optional[str], Optional[str]]
+
+
+class Catalog(Mapping[str, Script]):
+    """A registry of the compiled scripts in a folder, by name.
+
+    .. versionadded:: 1.0.0
+
+    A script's name is its path relative to the folder without the ``.sus`` extension and with
+    ``/`` as the separator, eg: ``imposter`` or ``uploads/my-story``. Use :meth:`load` or
+    :meth:`aload` to make one.
+
+    Attributes
+    -----------
+    directory: :class:`pathlib.Path`
+            The folder the scripts were loaded from.
+    errors: Mapping[:class:`str`, :class:`str`]
+            The files that couldn't be loaded by name and the error that stopped them.
+    warnings: Mapping[:class:`str`, :class:`str`]
+            The problems :func:`psup.analysis.analyze` found in loaded scripts by name, only when
+            they were loaded with ``check``.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import Catalog
+
+            catalog = Catalog.load("atlas")
+            for name, error in catalog.errors.items():
+                print(f"{name} failed to load: {error}")
+            story = catalog.story("imposter")
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        scripts: Dict[str, Script],
+        errors: Dict[str, str],
+        warnings: Dict[str, str],
+    ) -> None:
+        self.directory = directory
+        self._scripts = scripts
+        self.errors: Mapping[str, str] = errors
+        self.warnings: Mapping[str, str] = warnings
+
+    @classmethod
+    def load(
+        cls,
+        directory: Union[str, Path],
+        pattern: str = "*.sus",
+        recursive: bool = False,
+        workers: Optional[int] = None,
+        check: bool = False,
+    ) -> "Catalog":
+        """Finds and loads every sus file in a folder, parsing them in parallel.
+
+        Files are loaded with :func:`psup.cache.load_script` so the cache is used when it's enabled.
+
+        Parameters
+        -----------
+        directory: Union[:class:`str`, :class:`pathlib.Path`]
+                The folder to load.
+        pattern: :class:`str`
+                The glob pattern of the files to load.
+        recursive: :class:`bool`
+                Whether to also load the files in sub-folders.
+        workers: Optional[:class:`int`]
+                The amount of processes to parse in, defaults to the amount of CPU cores. ``1``
+                parses everything in the current process.
+        check: :class:`bool`
+                Whether to also run :func:`psup.analysis.analyze` on every script.
+        """
+        root = Path(directory)
+        if not root.is_dir():
+            raise StoryError(f"Catalog folder {root} doesn't exist.")
+        paths = sorted(
+            str(i) for i in (root.rglob if recursive else root.glob)(pattern)
+        )
+        workers = min(workers or cpu_count() or 1, len(paths))
+        if workers <= 1:
+            results: List[_Result] = [_load(i, check) for i in paths]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                chunksize = max(1, len(paths) // (workers * 4))
+                results = list(
+                    pool.map(_load, paths, [check] * len(paths), chunksize=chunksize)
+                )
+        scripts: Dict[str, Script] = dict()
+        errors: Dict[str, str] = dict()
+        warnings: Dict[str, str] = dict()
+        for path, script, error, warning in results:
+            name = Path(path).relative_to(root).with_suffix("").as_posix()
+            if script is None:
+                errors[name] = error or "Unknown error"
+                continue
+            scripts[name] = script
+            if warning is not None:
+                warnings[name] = warning
+        return cls(root, scripts, errors, warnings)
+
+    @classmethod
+    async def aload(
+        cls,
+        directory: Union[str, Path],
+        pattern: str = "*.sus",
+        recursive: bool = False,
+        workers: Optional[int] = None,
+        check: bool = False,
+    ) -> "Catalog":
+        """The same as :meth:`load` without blocking the event loop."""
+        return await get_running_loop().run_in_executor(
+            None, cls.load, directory, pattern, recursive, workers, check
+        )
+
+    def story(
+        self,
+        name: str,
+        io_function: IoFunction = _story_io,
+        story_class: Type[StoryT] = Story,  # type: ignore[assignment]
+    ) -> StoryT:
+        """Makes a new story of a script in the catalog.
+
+        Parameters
+        -----------
+        name: :class:`str`
+                The name of the script.
+        io_function: :class:`IoFunction`
+                The I/O function of the story.
+        story_class: Type[:class:`Story`]
+                The class of the story, for subclasses of :class:`Story`.
+        """
+        script = self._scripts.get(name)
+        if script is None:
+            if name in self.errors:
+                raise StoryError(f"Story {name} failed to load: {self.errors[name]}")
+            raise StoryError(f"Story {name} doesn't exist.")
+        return story_class(script, io_function)
+
+    def __getitem__(self, name: str) -> Script:
+        return self._scripts[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._scripts)
+
+    def __len__(self) -> int:
+        return len(self._scripts)
+
+    def __repr__(self) -> str:
+        return f"<Catalog directory={str(self.directory)!r} scripts={len(self)} errors={len(self.errors)}>"
+
+
+def _load(path: str, check: bool) -> _Result:
+    # Ran in the worker processes, errors are sent back as text since not all of them can be pickled.
+    try:
+        script = load_script(path)
+    except StoryError as error:
+        return path, None, str(error.args[0]), None
+    except Exception as error:
+        return path, None, f"{type(error).__name__}: {error}", None
+    warning = None
+    if check:
+        analysis = analyze(script)
+        if not analysis.ok:
+            warning = str(analysis)
+    return path, script, None, warning
@@ -0,0 +1,197 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from functools import lru_cache
+from re import compile as re_compile
+from re import split
+from typing import FrozenSet, Iterable, NamedTuple, Optional, Tuple, Union
+
+_INLINE_PATTERN = re_compile("{{(.+?)}}")
+_OPTION_FUNCTION_PATTERN = re_compile(r"\$\$(.+?)(,|$)")
+_OPTION_TITLE_PATTERN = re_compile(r"(,|^)(.+?)\$\$")
+
+
+class Call(NamedTuple):
+    """A SUS function call split into its function name and its raw arguments.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    name: :class:`str`
+            The name of the called function, eg: ``OPTION``.
+    args: Optional[:class:`str`]
+            Everything after the function name or ``None`` if the call had no arguments.
+    """
+
+    name: str
+    args: Optional[str]
+
+
+class Text(NamedTuple):
+    """A compiled story line which gets sent to the :class:`Story` object's I/O function.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    source: :class:`str`
+            The line as it was written in the sus file.
+    segments: Tuple[:class:`str`, ...]
+            The text around the inline functions, there's always one more segment than inlines.
+    inlines: Tuple[:class:`Call`, ...]
+            The inline function calls whose results go between the segments.
+    """
+
+    source: str
+    segments: Tuple[str, ...]
+    inlines: Tuple[Call, ...]
+
+
+class Command(NamedTuple):
+    """A compiled function line.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    source: :class:`str`
+            The line as it was written in the sus file.
+    call: :class:`Call`
+            The function call this line runs.
+    """
+
+    source: str
+    call: Call
+
+
+Instruction = Union[Text, Command]
+
+
+class Options(NamedTuple):
+    """The parsed choices of an ``OPTION`` function.
+
+    .. versionadded:: 1.0.0
+    """
+
+    titles: Tuple[str, ...]
+    calls: Tuple[Call, ...]
+
+
+class AttributeCheck(NamedTuple):
+    """The parsed arguments of a ``CHECKATTR`` or ``CHECKANYATTR`` function.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    required: FrozenSet[:class:`str`]
+            The attributes the player should have.
+    forbidden: FrozenSet[:class:`str`]
+            The attributes prefixed with ``!!`` which the player shouldn't have.
+    call: :class:`Call`
+            The function to run if the check passes.
+    """
+
+    required: FrozenSet[str]
+    forbidden: FrozenSet[str]
+    call: Call
+
+
+# Everything below is cached by its source string, this way a line is only ever parsed once no
+# matter how many times or by how many Story objects it's ran. The caches only keep the most
+# recently used ones so reloaded and lazily loaded scripts don't keep every line they ever had.
+_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_call(text: str) -> Call:
+    """Splits a function call into its name and arguments."""
+    name, sep, args = text.partition(" ")
+    return Call(name, args if sep else None)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_text(line: str) -> Text:
+    """Compiles a story line into its text segments and the inline function calls between them."""
+    if "{{" not in line:
+        return Text(line, (line,), ())
+    parts = _INLINE_PATTERN.split(line)
+    return Text(line, tuple(parts[::2]), tuple(parse_call(i) for i in parts[1::2]))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_options(args: str) -> Options:
+    """Parses the ``<choice-text> $$<function>`` pairs of an ``OPTION`` function."""
+    return Options(
+        tuple(i[1].strip() for i in _OPTION_TITLE_PATTERN.findall(args)),
+        tuple(parse_call(i[0].strip()) for i in _OPTION_FUNCTION_PATTERN.findall(args)),
+    )
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_attribute_check(args: str) -> AttributeCheck:
+    """Parses the attributes and function of a ``CHECKATTR`` or ``CHECKANYATTR`` function."""
+    attr, function = args.split("$$", 1)
+    attributes = parse_attributes(attr)
+    return AttributeCheck(
+        frozenset(i for i in attributes if not i.startswith("!!")),
+        frozenset(i[2:] for i in attributes if i.startswith("!!")),
+        parse_call(function),
+    )
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_attributes(args: str) -> Tuple[str, ...]:
+    """Splits a list of attributes separated by ``&&``, ``,`` or spaces."""
+    return tuple(i.strip() for i in split("&&|,| ", args) if i.strip())
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_choices(args: str) -> Tuple[Call, ...]:
+    """Parses the comma separated functions of a ``RANDOM`` function."""
+    return tuple(parse_call(i.strip()) for i in args.split(","))
+
+
+def compile_line(line: str) -> Instruction:
+    """Compiles a single (already merged and stripped) line of a sus file.
+
+    .. versionadded:: 1.0.0
+
+    Every line starting with ``-`` is compiled to a :class:`Command`, whether it really is one is
+    decided when it's ran since custom functions can be added at any point.
+    """
+    if line.startswith("- "):
+        return Command(line, parse_call(line[2:]))
+    if line.startswith("-"):
+        return Command(line, parse_call(line[1:]))
+    return parse_text(line)
+
+
+def compile_lines(lines: Iterable[str]) -> Tuple[Instruction, ...]:
+    """Compiles a Sub-story's lines into a tuple of instructions.
+
+    .. versionadded:: 1.0.0
+    """
+    return tuple(compile_line(i) for i in lines)
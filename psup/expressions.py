@@ -0,0 +1,323 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from functools import lru_cache
+from re import compile as re_compile
+from typing import Any, Mapping, NamedTuple, Optional, Union
+
+from .compiler import _CACHE_SIZE, Call, parse_call
+from .errors import StoryError
+
+_NUMBER_PATTERN = re_compile(r"-?\d+")
+_ARITHMETIC = {
+    "ADD",
+    "SUB",
+    "SUBTRACT",
+    "MULT",
+    "MULTIPLY",
+    "DIV",
+    "DIVIDE",
+    "RAND",
+    "RANDOM",
+}
+_COMPARISONS = {"IS", "ISNOT", "GREATER", "SMALLER"}
+
+
+class Value(NamedTuple):
+    """A number or text written directly in a ``UTILS`` function.
+
+    .. versionadded:: 1.0.0
+    """
+
+    value: Union[int, str]
+
+
+class Lookup(NamedTuple):
+    """A ``STORAGE GET`` read, done straight from the storage without running ``STORAGE``.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    key: :class:`str`
+            The name of the stored value.
+    call: :class:`Call`
+            The original call, ran instead if ``STORAGE`` was replaced by a custom function.
+    slot: :class:`int`
+            The slot of the value in a :class:`Storage`, ``-1`` until it's set by :func:`resolve`.
+    """
+
+    key: str
+    call: Call
+    slot: int = -1
+
+
+class Invoke(NamedTuple):
+    """A value that's the result of any other function, or the text itself if there's no function
+    with that name when it's evaluated.
+
+    .. versionadded:: 1.0.0
+    """
+
+    call: Call
+    text: str
+
+
+class Operation(NamedTuple):
+    """An arithmetic ``UTILS`` function: ``ADD``, ``SUB``, ``MULT``, ``DIV`` or ``RAND``.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    op: :class:`str`
+            The name of the operation as it was written, eg: ``SUBTRACT``.
+    left: Union[:class:`Value`, :class:`Lookup`, :class:`Invoke`, :class:`Operation`]
+            The first operand.
+    right: Union[:class:`Value`, :class:`Lookup`, :class:`Invoke`, :class:`Operation`]
+            The second operand.
+    call: :class:`Call`
+            The original call, ran instead if ``UTILS`` was replaced by a custom function.
+    """
+
+    op: str
+    left: Any
+    right: Any
+    call: Call
+
+
+class Comparison(NamedTuple):
+    """A comparing ``UTILS`` function: ``IS``, ``ISNOT``, ``GREATER`` or ``SMALLER``.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    op: :class:`str`
+            The name of the comparison.
+    left: Union[:class:`Value`, :class:`Lookup`, :class:`Invoke`, :class:`Operation`]
+            The first operand.
+    right: Union[:class:`Value`, :class:`Lookup`, :class:`Invoke`, :class:`Operation`]
+            The second operand.
+    call: :class:`Call`
+            The function ran if the comparison is true.
+    """
+
+    op: str
+    left: Any
+    right: Any
+    call: Call
+
+
+class Assign(NamedTuple):
+    """A ``STORAGE SET`` function.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    key: :class:`str`
+            The name of the variable.
+    value: Union[:class:`int`, :class:`str`]
+            The value to set, already converted to a number if it's one.
+    call: Optional[:class:`Call`]
+            The function whose result is set instead, for values prefixed with ``$$``.
+    slot: :class:`int`
+            The slot of the variable in a :class:`Storage`, ``-1`` until it's set by :func:`resolve`.
+    """
+
+    key: str
+    value: Union[int, str]
+    call: Optional[Call]
+    slot: int = -1
+
+
+Expression = Union[Value, Lookup, Invoke, Operation]
+
+
+def literal(text: str) -> Union[int, str]:
+    """Converts text to a number if it's one (negative numbers included), else keeps it as is."""
+    return int(text) if _NUMBER_PATTERN.fullmatch(text) else text
+
+
+def number(value: Any) -> Optional[int]:
+    """Gets the number a value represents or ``None`` if it isn't one."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and _NUMBER_PATTERN.fullmatch(value.strip()):
+        return int(value)
+    return None
+
+
+def calculate(op: str, left: Any, right: Any, rng: Any) -> int:
+    """Runs an arithmetic operation on two evaluated operands.
+
+    .. versionadded:: 1.0.0
+    """
+    first, second = number(left), number(right)
+    if op in ("RAND", "RANDOM"):
+        if first is None or second is None:
+            raise StoryError("Both values must be numbers in random ranges")
+        return rng.randrange(first, second)
+    if first is None:
+        raise StoryError(
+            f"Error in {op}, var 1: {left}. Both values must be numbers in operations"
+        )
+    if second is None:
+        raise StoryError(
+            f"Error in {op}, var 2: {right}. Both values must be numbers in operations"
+        )
+    if op == "ADD":
+        return first + second
+    if op in ("SUB", "SUBTRACT"):
+        return first - second
+    if op in ("MULT", "MULTIPLY"):
+        return first * second
+    if not second:
+        raise StoryError(f"Error in {op}, can't divide by zero")
+    return round(first / second)
+
+
+def compare(op: str, left: Any, right: Any) -> bool:
+    """Runs a comparison on two evaluated operands, numbers are equal to the same number as text.
+
+    .. versionadded:: 1.0.0
+    """
+    first, second = number(left), number(right)
+    if op == "IS":
+        return (left if first is None else first) == (
+            right if second is None else second
+        )
+    if op == "ISNOT":
+        return (left if first is None else first) != (
+            right if second is None else second
+        )
+    if first is None or second is None:
+        raise StoryError("Both values must be numbers in comparison")
+    return first > second if op == "GREATER" else first < second
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_operand(text: str) -> Expression:
+    """Parses an operand of a ``UTILS`` function."""
+    text = text.strip()
+    value = literal(text)
+    if isinstance(value, int):
+        return Value(value)
+    call = parse_call(text)
+    if (
+        call.name == "STORAGE"
+        and call.args is not None
+        and call.args.startswith("GET ")
+    ):
+        return Lookup(call.args[4:].strip(), call)
+    if call.name == "UTILS" and call.args is not None:
+        op, _, args = call.args.partition(" ")
+        if op in _ARITHMETIC:
+            return _parse_operation(op, args, call)
+    return Invoke(call, text)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_utils(op: str, args: str) -> Union[Operation, Comparison]:
+    """Parses the arguments of an arithmetic or comparing ``UTILS`` function.
+
+    .. versionadded:: 1.0.0
+
+    Every ``UTILS`` function is only parsed once, with ``STORAGE GET`` reads and nested ``UTILS``
+    operations turned into :class:`Lookup` and :class:`Operation` nodes so evaluating them doesn't
+    go through the function dispatch.
+    """
+    if op in _ARITHMETIC:
+        return _parse_operation(op, args, Call("UTILS", f"{op} {args}"))
+    if op in _COMPARISONS:
+        # The function is after the last $$ and the operands are split by the first comma.
+        *operands, function = args.split("$$")
+        if not operands:
+            raise StoryError(f"Missing function in {op}")
+        left, sep, right = "".join(operands).partition(",")
+        if not sep:
+            raise StoryError(f"{op} needs two values separated by a comma")
+        return Comparison(
+            op, parse_operand(left), parse_operand(right), parse_call(function)
+        )
+    raise StoryError(f"Unknown Function: {op}")
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_storage(args: str) -> Union[Assign, Lookup]:
+    """Parses the arguments of a ``STORAGE`` function.
+
+    .. versionadded:: 1.0.0
+    """
+    sub_func, _, args = args.partition(" ")
+    if sub_func == "SET":
+        key, sep, value = args.partition(" ")
+        if not sep:
+            raise StoryError(f"Missing value for STORAGE SET {key}")
+        if value.startswith("$$"):
+            return Assign(key.strip(), "", parse_call(value[2:]))
+        return Assign(key.strip(), literal(value), None)
+    if sub_func == "GET":
+        return Lookup(args.strip(), Call("STORAGE", f"GET {args}"))
+    raise StoryError(f"Unknown Function: {sub_func}")
+
+
+def resolve(expression: Any, slots: Mapping[str, int]) -> Any:
+    """Gives the :class:`Lookup` and :class:`Assign` nodes of a parsed expression their slots.
+
+    .. versionadded:: 1.0.0
+
+    Parsed expressions are shared by every script, so this is done by every script with its own
+    :attr:`Script.slots`. Variables without a slot keep ``-1`` and are used by their name instead.
+    """
+    if isinstance(expression, (Lookup, Assign)):
+        return expression._replace(slot=slots.get(expression.key, -1))
+    if isinstance(expression, (Operation, Comparison)):
+        return expression._replace(
+            left=resolve(expression.left, slots), right=resolve(expression.right, slots)
+        )
+    return expression
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_inline(call: Call) -> Optional[Expression]:
+    """Parses an inline function into a :class:`Lookup` or :class:`Operation` if it's one, these are
+    evaluated without running the function.
+
+    .. versionadded:: 1.0.0
+    """
+    if call.name in ("STORAGE", "UTILS") and call.args is not None:
+        expression = parse_operand(f"{call.name} {call.args}")
+        if isinstance(expression, (Lookup, Operation)):
+            return expression
+    return None
+
+
+def _parse_operation(op: str, args: str, call: Call) -> Operation:
+    # The operands of arithmetic are split by the last comma.
+    left, sep, right = args.rpartition(",")
+    if not sep:
+        raise StoryError(f"{op} needs two values separated by a comma")
+    return Operation(op, parse_operand(left), parse_operand(right), call)
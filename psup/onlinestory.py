@@ -22,12 +22,141 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from urllib.request import urlopen
+from collections import OrderedDict
+from threading import Lock, RLock
+from time import monotonic
+from typing import Optional
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from weakref import WeakValueDictionary
 
 from .errors import StoryError
+from .script import Script
 from .story import Story
 
 
+class _Entry:
+    __slots__ = ("text", "script", "etag", "last_modified", "fetched_at")
+
+    def __init__(
+        self, text: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> None:
+        self.text = text
+        self.script: Optional[Script] = None
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = monotonic()
+
+
+class FetchCache:
+    """The in memory cache of the stories fetched by :class:`OnlineStory`.
+
+    .. versionadded:: 1.0.0
+
+    Fresh stories are served without any request, stale ones are revalidated using their
+    ``ETag`` / ``Last-Modified`` headers and if the request fails the stale copy is used instead.
+    Concurrent requests for the same story wait for a single fetch and share its parsed
+    :class:`Script`.
+
+    Parameters
+    -----------
+    ttl: :class:`float`
+            The amount of seconds a fetched story is used without revalidating it.
+    max_size: :class:`int`
+            The maximum total size of the cached stories in characters, the least recently used
+            ones are dropped first.
+    timeout: :class:`float`
+            The timeout of every request in seconds.
+    """
+
+    def __init__(
+        self, ttl: float = 300.0, max_size: int = 8_000_000, timeout: float = 10.0
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        # The lock of every url being fetched, only kept while someone's using it.
+        self._url_locks: "WeakValueDictionary[str, RLock]" = WeakValueDictionary()
+
+    def get_text(self, url: str) -> str:
+        """Gets the content of a url, fetching it only if needed."""
+        return self._get(url).text
+
+    def get_script(self, url: str) -> Script:
+        """Gets the parsed :class:`Script` of a url, fetching and parsing it only if needed."""
+        with self._url_lock(url):
+            entry = self._get(url)
+            if entry.script is None:
+                entry.script = Script(entry.text, url)
+            return entry.script
+
+    def clear(self) -> None:
+        """Drops every cached story."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _url_lock(self, url: str) -> RLock:
+        with self._lock:
+            lock = self._url_locks.get(url)
+            if lock is None:
+                lock = self._url_locks[url] = RLock()
+            return lock
+
+    def _get(self, url: str) -> _Entry:
+        with self._url_lock(url):
+            with self._lock:
+                entry = self._entries.get(url)
+                if entry is not None:
+                    self._entries.move_to_end(url)
+                    if monotonic() - entry.fetched_at < self.ttl:
+                        return entry
+            headers = dict()
+            if entry is not None:
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
+            try:
+                with urlopen(
+                    Request(url, headers=headers), timeout=self.timeout
+                ) as res:
+                    new = _Entry(
+                        res.read().decode("UTF-8"),
+                        res.headers.get("ETag"),
+                        res.headers.get("Last-Modified"),
+                    )
+            except HTTPError as e:
+                if e.code == 304 and entry is not None:
+                    entry.fetched_at = monotonic()
+                    return entry
+                if e.code == 404:
+                    raise StoryError(f"Story not found: {url}") from None
+                if entry is not None:
+                    return entry
+                raise
+            except (URLError, OSError):
+                if entry is not None:  # Offline, the stale copy is better than nothing.
+                    return entry
+                raise
+            self._store(url, new)
+            return new
+
+    def _store(self, url: str, entry: _Entry) -> None:
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._size -= len(old.text)
+            self._entries[url] = entry
+            self._size += len(entry.text)
+            while self._size > self.max_size and len(self._entries) > 1:
+                _, dropped = self._entries.popitem(last=False)
+                self._size -= len(dropped.text)
+
+
 class OnlineStory(Story):
     """The class to play stories from the ones existing in the GitHub repository.
 
@@ -36,16 +165,17 @@ class OnlineStory(Story):
 
     This class inherits from :class:`.Story` and hence shares all the methods and attributes.
     The only difference is the reference is the file's name from the GitHub repo.
+
+    Fetched stories are kept in :attr:`cache`, a :class:`FetchCache` shared by every
+    :class:`OnlineStory`, so starting many stories with the same name only fetches and parses it once.
     """
 
-    def _get_text(self) -> str:
-        text = (
-            urlopen(
-                f"https://raw.github.com/EnokiUN/psup/master/atlas/{self.reference}"
-            )
-            .read()
-            .decode("UTF-8")
-        )
-        if len(text.splitlines()) <= 2:
-            raise StoryError(f"Story not found: {self.reference}")
-        return text
+    base_url = "https://raw.github.com/EnokiUN/psup/master/atlas/"
+    cache = FetchCache()
+
+    @classmethod
+    def _load_script(cls, reference: str) -> Script:
+        url = cls.base_url + reference
+        if len(cls.cache.get_text(url).splitlines()) <= 2:
+            raise StoryError(f"Story not found: {reference}")
+        return cls.cache.get_script(url)
@@ -0,0 +1,295 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from functools import wraps
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .compiler import Call, parse_call
+from .story import Story, _pending
+
+
+class Event(NamedTuple):
+    """A single measurement given to the sink of a :class:`Profiler`.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    kind: :class:`str`
+            ``"function"`` for SUScript functions, ``"line"`` for lines and ``"io"`` for the I/O function.
+    name: :class:`str`
+            The name of the function, empty for lines and I/O.
+    sub_story: :class:`str`
+            The Sub-story the story was in when the measurement started.
+    line: :class:`int`
+            The line the story was on when the measurement started.
+    elapsed: :class:`float`
+            The time it took in seconds.
+    """
+
+    kind: str
+    name: str
+    sub_story: str
+    line: int
+    elapsed: float
+
+
+class Stats:
+    """The collected times of a function or a line.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    calls: :class:`int`
+            How many times it ran.
+    total: :class:`float`
+            The time spent in it in seconds, including the functions it called and the I/O.
+    own: :class:`float`
+            The time spent in it in seconds without the functions it called and the I/O.
+    """
+
+    __slots__ = ("calls", "total", "own")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+
+    def __repr__(self) -> str:
+        return f"<Stats calls={self.calls} total={self.total:.6f} own={self.own:.6f}>"
+
+
+class Profiler:
+    """Measures where the time of running stories goes.
+
+    A profiler only replaces the ``_call``, ``_step`` and ``io`` of the stories it's attached to
+    so stories that aren't being profiled run exactly as fast as before.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    functions: Dict[:class:`str`, :class:`Stats`]
+            The stats of every SUScript function that ran, including custom functions.
+    lines: Dict[Tuple[:class:`str`, :class:`int`], :class:`Stats`]
+            The stats of every line that ran by Sub-story and line number.
+    io_calls: :class:`int`
+            How many times the I/O function was called.
+    io_time: :class:`float`
+            The time spent waiting on the I/O function in seconds.
+    total_time: :class:`float`
+            The time spent running lines in seconds, including the I/O.
+    sink: Optional[Callable[[:class:`Event`], Any]]
+            A function called with every measurement as it happens.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import Story
+            from psup.profiler import Profiler
+
+            profiler = Profiler()
+            story = profiler.attach(Story("story.sus"))
+            story.start()
+            print(profiler.report())
+    """
+
+    def __init__(
+        self,
+        sink: Optional[Callable[[Event], Any]] = None,
+        clock: Callable[[], float] = perf_counter,
+    ) -> None:
+        self.sink = sink
+        self.clock = clock
+        self._io: Dict[int, Any] = dict()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears everything that was measured so far."""
+        self.functions: Dict[str, Stats] = dict()
+        self.lines: Dict[Tuple[str, int], Stats] = dict()
+        self.io_calls = 0
+        self.io_time = 0.0
+        self.total_time = 0.0
+
+    @property
+    def interpreter_time(self) -> float:
+        """The time spent running lines without waiting on the I/O function in seconds."""
+        return self.total_time - self.io_time
+
+    def attach(self, story: Story) -> Story:
+        """Starts profiling a story, a profiler can be attached to many stories at once.
+
+        Returns the story so it can be used inline.
+        """
+        if id(story) in self._io:
+            return story
+        clock = self.clock
+        # The time taken by the children of every measurement that's running, to get the own time.
+        stack: List[float] = [0.0]
+        call, step, io = story._call, story._step, story.io
+
+        def close(start: float, record: Callable[[float, float], None]) -> None:
+            elapsed = clock() - start
+            children = stack.pop()
+            stack[-1] += elapsed
+            record(elapsed, children)
+
+        async def finish(
+            ret: Awaitable[Any], start: float, record: Callable[[float, float], None]
+        ) -> Any:
+            try:
+                return await ret
+            finally:
+                close(start, record)
+
+        def measure(
+            function: Callable[..., Any],
+            args: Any,
+            record: Callable[[float, float], None],
+        ) -> Any:
+            # Functions that have to wait are measured until what they return is awaited.
+            stack.append(0.0)
+            start = clock()
+            try:
+                ret = function(args)
+            except BaseException:
+                close(start, record)
+                raise
+            if _pending(ret):
+                return finish(ret, start, record)
+            close(start, record)
+            return ret
+
+        @wraps(call)
+        def _call(args: Union[str, Call]) -> Any:
+            name = (parse_call(args) if isinstance(args, str) else args).name
+            sub_story, line = story.sub_story, story.line
+
+            def record(elapsed: float, children: float) -> None:
+                stats = self.functions.get(name)
+                if stats is None:
+                    stats = self.functions[name] = Stats()
+                stats.calls += 1
+                stats.total += elapsed
+                stats.own += elapsed - children
+                if self.sink is not None:
+                    self.sink(Event("function", name, sub_story, line, elapsed))
+
+            return measure(call, args, record)
+
+        @wraps(step)
+        def _step(line: Optional[str] = None) -> Any:
+            sub_story, number = story.sub_story, story.line
+
+            def record(elapsed: float, children: float) -> None:
+                if (
+                    len(stack) == 1
+                ):  # Lines ran by custom functions are already counted.
+                    self.total_time += elapsed
+                if line is None:
+                    stats = self.lines.get((sub_story, number))
+                    if stats is None:
+                        stats = self.lines[(sub_story, number)] = Stats()
+                    stats.calls += 1
+                    stats.total += elapsed
+                    stats.own += elapsed - children
+                if self.sink is not None:
+                    self.sink(Event("line", "", sub_story, number, elapsed))
+
+            return measure(step, line, record)
+
+        @wraps(io)
+        async def _io(*args: Any, **kwargs: Any) -> Any:
+            sub_story, line = story.sub_story, story.line
+            start = clock()
+            try:
+                return await io(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack[-1] += elapsed
+                self.io_calls += 1
+                self.io_time += elapsed
+                if self.sink is not None:
+                    self.sink(Event("io", "", sub_story, line, elapsed))
+
+        self._io[id(story)] = io
+        story._call = _call  # type: ignore
+        story._step = _step  # type: ignore
+        story.io = _io
+        return story
+
+    def detach(self, story: Story) -> None:
+        """Stops profiling a story and puts its original methods and I/O function back."""
+        io = self._io.pop(id(story), None)
+        if io is None:
+            return
+        vars(story).pop("_call", None)
+        vars(story).pop("_step", None)
+        story.io = io
+
+    def report(self, limit: Optional[int] = 20) -> str:
+        """Makes a table of the functions and lines that took the most time.
+
+        Parameters
+        -----------
+        limit: Optional[:class:`int`]
+                The maximum amount of functions and lines to show, ``None`` shows all of them.
+        """
+        lines = [
+            f"Total time: {self.total_time:.6f}s",
+            f"Interpreter time: {self.interpreter_time:.6f}s",
+            f"I/O time: {self.io_time:.6f}s in {self.io_calls} calls",
+            "",
+            f"{'Function':<24}{'Calls':>10}{'Total':>14}{'Own':>14}",
+        ]
+        functions = sorted(self.functions.items(), key=lambda i: i[1].own, reverse=True)
+        for name, stats in functions[:limit]:
+            lines.append(
+                f"{name:<24}{stats.calls:>10}{stats.total:>14.6f}{stats.own:>14.6f}"
+            )
+        lines.extend(["", f"{'Line':<24}{'Hits':>10}{'Total':>14}{'Own':>14}"])
+        hot_lines = sorted(self.lines.items(), key=lambda i: i[1].own, reverse=True)
+        for (sub_story, number), stats in hot_lines[:limit]:
+            location = f"{sub_story}:{number}"
+            lines.append(
+                f"{location:<24}{stats.calls:>10}{stats.total:>14.6f}{stats.own:>14.6f}"
+            )
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.report()
@@ -0,0 +1,306 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from asyncio import sleep
+from os import stat
+from os.path import abspath
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from weakref import WeakSet
+
+from .catalog import Catalog
+from .errors import StoryError
+from .script import LazyScript, Script, _digest
+from .storage import Storage
+from .story import IoFunction, Story, _story_io
+
+
+class Move(NamedTuple):
+    """Where :func:`relocate` moved a story to.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    sub_story: :class:`str`
+            The new Sub-story.
+    line: :class:`int`
+            The new line.
+    rule: :class:`str`
+            Which rule decided the position, one of:
+
+            - ``"kept"`` the Sub-story didn't change so the story stays where it was.
+            - ``"line"`` the Sub-story changed and the story moved to the same line of text, the
+              closest one to where it was if there are many.
+            - ``"tag"`` the line is gone and the story moved to the closest Tag before it.
+            - ``"sub-story"`` there's no such Tag so the story moved to the start of the Sub-story.
+            - ``"start"`` the Sub-story is gone so the story moved to the start of the script.
+    """
+
+    sub_story: str
+    line: int
+    rule: str
+
+
+class Reload(NamedTuple):
+    """A file reloaded by a :class:`Watcher`.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    path: :class:`str`
+            The reloaded file.
+    old: :class:`Script`
+            The script before the reload.
+    new: Optional[:class:`Script`]
+            The script after the reload, ``None`` if the file is invalid now and wasn't reloaded.
+    changed: Tuple[:class:`str`, ...]
+            The Sub-stories that were added, removed or changed.
+    moves: Tuple[:class:`Move`, ...]
+            Where every story of the file was moved to.
+    error: Optional[:class:`str`]
+            Why the file couldn't be reloaded.
+    """
+
+    path: str
+    old: Script
+    new: Optional[Script]
+    changed: Tuple[str, ...]
+    moves: Tuple[Move, ...]
+    error: Optional[str]
+
+
+def relocate(story: Story, script: Script) -> Move:
+    """Switches a story to a new version of its script, keeping its place as well as possible.
+
+    .. versionadded:: 1.0.0
+
+    The rules are tried in the order documented by :class:`Move`, the storage and attributes are
+    kept. A story waiting on its I/O function moves when the line it's on finishes, so it's best
+    to relocate stories between lines.
+
+    The file of a :class:`LazyScript` has usually been edited already, so the old script's file
+    is never read, its Sub-stories are compared by the hashes taken when it was opened and the
+    ``"line"`` rule only applies to the ones that are still in memory.
+    """
+    old = story.script
+    name, line = story.sub_story, story.line
+    new_lines = script.sub_stories.get(name)
+    move: Optional[Move] = None
+    if new_lines is not None and _unchanged(old, script, name):
+        move = Move(name, line, "kept")
+    elif new_lines is not None:
+        old_lines = _lines(old, name)
+        if old_lines is not None and line < len(old_lines):
+            matches = [i for i, text in enumerate(new_lines) if text == old_lines[line]]
+            if matches:
+                move = Move(name, min(matches, key=lambda i: abs(i - line)), "line")
+    if move is None:
+        # The closest Tag before the line that's still there.
+        tags = [
+            (i[1], tag) for tag, i in old.tags.items() if i[0] == name and i[1] <= line
+        ]
+        for _, tag in sorted(tags, reverse=True):
+            if tag in script.tags:
+                move = Move(*script.tags[tag], "tag")
+                break
+    if move is None:
+        if new_lines:
+            move = Move(name, 0, "sub-story")
+        else:
+            move = Move(script.first, 0, "start")
+    story.script = script
+    # Moving the storage after the script so it's read by the new script's slots.
+    if isinstance(story.storage, Storage) and story.storage.slots is not script.slots:
+        storage = Storage(script.slots)
+        storage.update(story.storage)
+        story.storage = storage
+    story.sub_story, story.line = move.sub_story, move.line
+    return move
+
+
+def _lines(script: Script, name: str) -> Optional[Tuple[str, ...]]:
+    # The lines of a Sub-story without reading the file of a LazyScript.
+    if isinstance(script, LazyScript):
+        with script._lock:
+            section = script._sections.get(name)
+        return None if section is None else section[0]
+    return script.sub_stories.get(name)
+
+
+def _unchanged(old: Script, new: Script, name: str) -> bool:
+    if isinstance(old, LazyScript) and isinstance(new, LazyScript):
+        return name in old._digests and old._digests[name] == new._digests.get(name)
+    old_lines = _lines(old, name)
+    return old_lines is not None and old_lines == new.sub_stories.get(name)
+
+
+class Watcher:
+    """Reloads sus files when they're edited and moves their running stories to the new version.
+
+    .. versionadded:: 1.0.0
+
+    Files are polled with :func:`os.stat`, only edited files are parsed again and only their
+    changed Sub-stories are compiled again, so checking a big catalog costs about as much as the
+    edits. Stories are moved with :func:`relocate`.
+
+    Parameters
+    -----------
+    interval: :class:`float`
+            The amount of seconds between checks in :meth:`run`.
+    catalog: Optional[:class:`Catalog`]
+            A catalog to watch every script of and keep up to date.
+
+    Attributes
+    -----------
+    listeners: List[Callable[[:class:`Reload`], Any]]
+            Functions called with every reload.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup.reload import Watcher
+
+            watcher = Watcher()
+            story = watcher.story("story.sus")
+            task = asyncio.create_task(watcher.run())
+            await story.astart()
+    """
+
+    def __init__(
+        self, interval: float = 1.0, catalog: Optional[Catalog] = None
+    ) -> None:
+        self.interval = interval
+        self.catalog = catalog
+        self.listeners: List[Callable[[Reload], Any]] = list()
+        self._scripts: Dict[str, Script] = dict()
+        self._stats: Dict[str, Tuple[int, int]] = dict()
+        self._stories: Dict[str, "WeakSet[Story]"] = dict()
+        self._names: Dict[str, str] = dict()
+        if catalog is not None:
+            for name, script in catalog.items():
+                self._names[self.watch(script.reference, script)] = name
+
+    def watch(self, path: str, script: Optional[Script] = None) -> str:
+        """Starts watching a file, returns its absolute path which the watcher knows it by.
+
+        Parameters
+        -----------
+        path: :class:`str`
+                The path of the sus file.
+        script: Optional[:class:`Script`]
+                The already loaded script of the file, it's read from the file if not given.
+        """
+        key = abspath(path)
+        if key not in self._scripts:
+            source_stat = stat(key)
+            self._scripts[key] = Script.from_file(path) if script is None else script
+            self._stats[key] = (source_stat.st_mtime_ns, source_stat.st_size)
+            self._stories[key] = WeakSet()
+        return key
+
+    def script(self, path: str) -> Script:
+        """Gets the current script of a watched file."""
+        return self._scripts[abspath(path)]
+
+    def attach(self, story: Story) -> Story:
+        """Makes a story follow the reloads of its file, which is watched if it isn't already.
+
+        Returns the story so it can be used inline.
+        """
+        key = self.watch(story.script.reference, story.script)
+        if story.script is not self._scripts[key]:
+            relocate(story, self._scripts[key])
+        self._stories[key].add(story)
+        return story
+
+    def story(self, path: str, io_function: IoFunction = _story_io) -> Story:
+        """Makes a new story of a watched file that follows its reloads."""
+        return self.attach(Story(self._scripts[self.watch(path)], io_function))
+
+    def check(self) -> List[Reload]:
+        """Checks every watched file once and reloads the edited ones."""
+        reloads = list()
+        for key, old in list(self._scripts.items()):
+            try:
+                source_stat = stat(key)
+            except OSError:
+                continue  # Deleted files keep their last version.
+            current = (source_stat.st_mtime_ns, source_stat.st_size)
+            if current == self._stats[key]:
+                continue
+            self._stats[key] = current
+            try:
+                reload = self._reload(key, old)
+            except (Exception, StoryError) as error:
+                # One broken file doesn't stop the others (or run) from being reloaded.
+                message = (
+                    error.args[0] if isinstance(error, StoryError) else repr(error)
+                )
+                reload = Reload(key, old, None, (), (), str(message))
+            if reload is not None:
+                reloads.append(reload)
+                for listener in self.listeners:
+                    listener(reload)
+        return reloads
+
+    async def run(self) -> None:
+        """Checks the watched files every :attr:`interval` seconds until it's cancelled."""
+        while True:
+            self.check()
+            await sleep(self.interval)
+
+    def _reload(self, key: str, old: Script) -> Optional[Reload]:
+        try:
+            if isinstance(old, LazyScript):
+                # Indexing the new version is one pass over the file, same as hashing it.
+                new: Script = LazyScript(old.reference, old.max_sections)
+                if new.digest == old.digest:
+                    return None  # Only touched.
+            else:
+                with open(key, "r", encoding="UTF-8") as sf:
+                    source = sf.read()
+                if _digest(source) == old.digest:
+                    return None
+                new = Script(source, old.reference, previous=old)
+        except (OSError, UnicodeDecodeError, StoryError) as error:
+            message = error.args[0] if isinstance(error, StoryError) else str(error)
+            return Reload(key, old, None, (), (), str(message))
+        self._scripts[key] = new
+        if self.catalog is not None and key in self._names:
+            self.catalog._scripts[self._names[key]] = new
+        names = {**dict.fromkeys(old.sub_stories), **dict.fromkeys(new.sub_stories)}
+        if isinstance(old, LazyScript):
+            changed = tuple(i for i in names if not _unchanged(old, new, i))
+        else:
+            changed = tuple(
+                i
+                for i in names
+                if i not in old.sub_stories
+                or i not in new.sub_stories
+                or new.code[i] is not old.code[i]
+            )
+        moves = tuple(relocate(story, new) for story in list(self._stories[key]))
+        return Reload(key, old, new, changed, moves, None)
@@ -0,0 +1,244 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import random
+from random import Random
+from typing import Any, Iterable, List, NamedTuple, Optional, TextIO, Type, TypeVar
+
+from .backends import ScriptedIO, expects_answer
+from .errors import StoryError
+from .script import Script
+from .simulator import _drive
+from .story import IoFunction, Story
+
+StoryT = TypeVar("StoryT", bound=Story)
+
+
+class Recording(NamedTuple):
+    """The seed and inputs of a recorded session, everything needed to play it again.
+
+    .. versionadded:: 1.0.0
+
+    A recording is stored as lines of json, a header followed by one line per input, this way a
+    recording being written can be appended to and read at any time.
+
+    Attributes
+    -----------
+    reference: :class:`str`
+            The reference of the recorded story.
+    digest: :class:`str`
+            The hex sha256 hash of the recorded story's :class:`Script`.
+    seed: :class:`int`
+            The seed of the story's random number generator.
+    inputs: List[:class:`str`]
+            The answers to every option and prompt in order.
+    """
+
+    reference: str
+    digest: str
+    seed: int
+    inputs: List[str]
+
+    def header(self) -> str:
+        """The first line of the recording's json lines."""
+        return json.dumps(
+            {"reference": self.reference, "digest": self.digest, "seed": self.seed},
+            separators=(",", ":"),
+        )
+
+    def dumps(self) -> str:
+        """Converts the recording to json lines."""
+        return "".join(
+            [self.header() + "\n"]
+            + [json.dumps(i, ensure_ascii=False) + "\n" for i in self.inputs]
+        )
+
+    @classmethod
+    def loads(cls, text: str) -> "Recording":
+        """Reads a recording from json lines.
+
+        Raises
+        -----------
+        StoryError
+                The recording is invalid.
+        """
+        lines = [i for i in text.splitlines() if i.strip()]
+        try:
+            header = json.loads(lines[0])
+            inputs = [json.loads(i) for i in lines[1:]]
+            return cls(
+                header["reference"], header["digest"], int(header["seed"]), inputs
+            )
+        except (IndexError, KeyError, TypeError, ValueError):
+            raise StoryError("Invalid recording") from None
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """Reads a recording from a file."""
+        with open(path, "r", encoding="UTF-8") as f:
+            return cls.loads(f.read())
+
+
+class Recorder:
+    """An I/O function that records the answers of another one.
+
+    .. versionadded:: 1.0.0
+
+    Use :func:`record` to attach one to a story.
+
+    Attributes
+    -----------
+    io: :class:`IoFunction`
+            The recorded I/O function.
+    recording: :class:`Recording`
+            The recording so far.
+    path: Optional[:class:`str`]
+            The file every input is appended to as it's given.
+    """
+
+    def __init__(
+        self, io: IoFunction, recording: Recording, path: Optional[str] = None
+    ) -> None:
+        self.io = io
+        self.recording = recording
+        self.path = path
+        if path is not None:
+            with open(path, "w", encoding="UTF-8") as f:
+                f.write(recording.dumps())
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        answer = await self.io(text, **kwargs)
+        if expects_answer(text, **kwargs):
+            self.recording.inputs.append(answer)
+            if self.path is not None:
+                with open(self.path, "a", encoding="UTF-8") as f:
+                    f.write(json.dumps(answer, ensure_ascii=False) + "\n")
+        return answer
+
+
+def record(
+    story: Story, seed: Optional[int] = None, path: Optional[str] = None
+) -> Recording:
+    """Starts recording a story's session.
+
+    .. versionadded:: 1.0.0
+
+    The story gets its own random number generator so ``RANDOM`` and ``UTILS RAND`` can be played
+    again and its I/O function is wrapped by a :class:`Recorder`. Call it before the story starts.
+
+    Parameters
+    -----------
+    story: :class:`Story`
+            The story to record.
+    seed: Optional[:class:`int`]
+            The seed of the story's random number generator, a random one by default.
+    path: Optional[:class:`str`]
+            A file to write the recording to as it happens, see :meth:`Recording.load`.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import Story
+            from psup.replay import record
+
+            story = Story("story.sus")
+            record(story, path="session.jsonl")
+            story.start()
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    recording = Recording(story.reference, story.script.digest.hex(), seed, list())
+    story.rng = Random(seed)
+    story.io = Recorder(story.io, recording, path)
+    return recording
+
+
+def replay(
+    script: Script,
+    recording: Recording,
+    steps: Optional[int] = None,
+    inputs: Optional[int] = None,
+    stream: Optional[TextIO] = None,
+    story_class: Type[StoryT] = Story,  # type: ignore[assignment]
+) -> StoryT:
+    """Plays a recording again without waiting on any I/O.
+
+    .. versionadded:: 1.0.0
+
+    The story stops at the line where the recording ran out of inputs, or earlier if ``steps`` or
+    ``inputs`` is given. The returned story can be looked at, snapshotted or continued by giving it
+    a new I/O function.
+
+    Parameters
+    -----------
+    script: :class:`Script`
+            The script of the recorded story.
+    recording: :class:`Recording`
+            The recording to play.
+    steps: Optional[:class:`int`]
+            The maximum amount of lines to run.
+    inputs: Optional[:class:`int`]
+            The maximum amount of the recording's inputs to use.
+    stream: Optional[TextIO]
+            A stream to write the story's output to, it's ignored by default.
+    story_class: Type[:class:`Story`]
+            The class of the story, for subclasses of :class:`Story`.
+
+    Raises
+    -----------
+    StoryError
+            The recording was made with a different script.
+    """
+    if recording.digest != script.digest.hex():
+        raise StoryError("Recording was made with a different script")
+    answers = recording.inputs if inputs is None else recording.inputs[:inputs]
+    story = story_class(script, ScriptedIO(answers, stream))
+    story.rng = Random(recording.seed)
+    step = 0
+    while not story.ended and (steps is None or step < steps):
+        try:
+            _drive(story._step())
+        except EOFError:
+            break
+        step += 1
+    return story
+
+
+def corpus(paths: Iterable[str]) -> List[Recording]:
+    """Reads many recordings, eg: to play real sessions again as a load test.
+
+    .. versionadded:: 1.0.0
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from glob import glob
+            from psup.replay import corpus
+
+            recordings = corpus(glob("recordings/*.jsonl"))
+    """
+    return [Recording.load(i) for i in paths]
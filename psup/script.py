@@ -0,0 +1,509 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from bisect import bisect_right
+from collections import OrderedDict
+from hashlib import sha256
+from re import compile as re_compile
+from threading import Lock
+from types import MappingProxyType
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .compiler import Instruction, compile_lines
+from .errors import StoryError
+
+_STORY_PATTERN = re_compile(r"\[STORY ([a-zA-Z0-9-]+?)\]")
+_VARIABLE_PATTERN = re_compile(r"STORAGE (?:SET|GET) ([^\s,$}]+)")
+
+
+class Script:
+    """The parsed and compiled form of a sus file.
+
+    .. versionadded:: 1.0.0
+
+    A :class:`Script` is immutable, this means that one can safely be shared between any number of
+    :class:`Story` objects (and threads) instead of every one of them reading and parsing the same
+    file again.
+
+    When a new version of a script is parsed the ``previous`` one can be passed to reuse the
+    compiled code of the Sub-stories that didn't change, see :class:`psup.reload.Watcher`.
+
+    Attributes
+    -----------
+    reference: :class:`str`
+            The reference the script was loaded from.
+    text: Tuple[:class:`str`, ...]
+            Every line of text in the sus file that isn't a comment / empty line.
+    sub_stories: Mapping[:class:`str`, Tuple[:class:`str`, ...]]
+            The Sub-stories and their lines.
+    tags: Mapping[:class:`str`, Tuple[:class:`str`, :class:`int`]]
+            The Tags and the Sub-story and line they're in.
+    code: Mapping[:class:`str`, Tuple[Union[:class:`Text`, :class:`Command`], ...]]
+            The compiled lines of every Sub-story.
+    first: :class:`str`
+            The name of the first Sub-story.
+    digest: :class:`bytes`
+            The sha256 hash of the sus file's source with its newlines made ``"\\n"``, used to tell
+            scripts apart, it's the same however the file was read.
+    variables: Tuple[:class:`str`, ...]
+            The names of the variables the script's ``STORAGE`` functions use, starting with
+            ``attributes``.
+    slots: Mapping[:class:`str`, :class:`int`]
+            The slot of every variable in a :class:`Storage`.
+    successors: Mapping[:class:`str`, Optional[:class:`str`]]
+            The Sub-story that comes after every Sub-story or ``None`` for the last one.
+    offsets: Mapping[:class:`str`, :class:`int`]
+            The position of every Sub-story's first line counting from the first line of the
+            first Sub-story.
+    length: :class:`int`
+            The total amount of lines in all Sub-stories.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import Script, Story
+
+            script = Script.from_file("story.sus")
+            stories = [Story(script) for _ in range(1000)]
+    """
+
+    __slots__ = (
+        "reference",
+        "text",
+        "sub_stories",
+        "tags",
+        "code",
+        "first",
+        "digest",
+        "successors",
+        "offsets",
+        "length",
+        "variables",
+        "slots",
+        "_names",
+        "_starts",
+        "_commands",
+        "_expressions",
+    )
+
+    reference: str
+    text: Tuple[str, ...]
+    sub_stories: Mapping[str, Tuple[str, ...]]
+    tags: Mapping[str, Tuple[str, int]]
+    code: Mapping[str, Tuple[Instruction, ...]]
+    first: str
+    digest: bytes
+    variables: Tuple[str, ...]
+    slots: Mapping[str, int]
+    successors: Mapping[str, Optional[str]]
+    offsets: Mapping[str, int]
+    length: int
+    _names: Tuple[str, ...]
+    _starts: Tuple[int, ...]
+    _commands: Dict[str, Any]
+    _expressions: Dict[Any, Any]
+
+    def __init__(
+        self,
+        source: str,
+        reference: str = "<string>",
+        previous: Optional["Script"] = None,
+    ) -> None:
+        text = _merge_lines(source)
+        if not text:
+            raise StoryError(
+                "Story file is empty"
+            )  # Raising an error if the story is empty / all comments.
+        # Checking if the story has any Sub stories, if not it raises an error.
+        if all(_STORY_PATTERN.findall(i) == [] for i in text):
+            raise StoryError("No Story sections found")
+        first = str()
+        tags: Dict[str, Tuple[str, int]] = dict()
+        sub_stories: Dict[str, Tuple[str, ...]] = dict()
+        temp_list: List[str] = list()
+        # Marking Sub-stories with their text and setting the Tags' location.
+        for i in text:
+            sub_story = _STORY_PATTERN.findall(i)
+            if sub_story:
+                if temp_list:
+                    sub_stories[temp_list[0]] = tuple(temp_list[1:])
+                    temp_list.clear()
+                if not first:
+                    first = sub_story[0]
+                if sub_story[0] in sub_stories:
+                    raise StoryError(f"Duplicate 'Sub-story': {sub_story}")
+                temp_list = [sub_story[0]]
+                continue
+            i, tag = _split_tag(i)
+            if tag is not None:
+                if not temp_list:
+                    raise StoryError(f"Tag {tag} comes before the first Sub-story")
+                # Raising an error if there's a duplicate Tag name.
+                if tag in tags:
+                    raise StoryError(f"Duplicate Tag: {tag}")
+                tags[tag] = (temp_list[0], len(temp_list) - 1)
+            temp_list.append(i)
+        if temp_list:
+            sub_stories[temp_list[0]] = tuple(temp_list[1:])
+        set_ = object.__setattr__
+        set_(self, "reference", reference)
+        set_(self, "text", tuple(text))
+        set_(self, "sub_stories", MappingProxyType(sub_stories))
+        set_(self, "tags", MappingProxyType(tags))
+        # Compiling every Sub-story once so running a line doesn't need to parse it again, the ones
+        # that didn't change since the previous version of the script are reused.
+        code: Dict[str, Tuple[Instruction, ...]] = dict()
+        for name, lines in sub_stories.items():
+            if previous is not None and previous.sub_stories.get(name) == lines:
+                code[name] = previous.code[name]
+            else:
+                code[name] = compile_lines(lines)
+        set_(self, "code", MappingProxyType(code))
+        set_(self, "first", first)
+        set_(self, "digest", _digest(source))
+        _link(self, variables=_find_variables(text))
+
+    @classmethod
+    def from_file(cls, path: str) -> "Script":
+        """Reads and parses a sus file.
+
+        Parameters
+        -----------
+        path: :class:`str`
+                The path of the sus file.
+        """
+        with open(path, "r", encoding="UTF-8") as sf:
+            return cls(sf.read(), path)
+
+    def locate(self, offset: int) -> Optional[Tuple[str, int]]:
+        """Gets the Sub-story and line of a line by its position in :attr:`offsets`.
+
+        Returns ``None`` if the position is past the last line.
+        """
+        if not 0 <= offset < self.length:
+            return None
+        name = self._names[bisect_right(self._starts, offset) - 1]
+        return name, offset - self.offsets[name]
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        return (
+            _restore,
+            (
+                self.reference,
+                self.text,
+                dict(self.sub_stories),
+                dict(self.tags),
+                dict(self.code),
+                self.first,
+                self.digest,
+                self.variables,
+            ),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __repr__(self) -> str:
+        return (
+            f"<Script reference={self.reference!r} sub_stories={len(self.sub_stories)}>"
+        )
+
+
+class LazyScript(Script):
+    """A :class:`Script` that only reads and compiles a Sub-story when it's first used.
+
+    .. versionadded:: 1.0.0
+
+    Opening a lazy script reads the sus file once line by line to find where every Sub-story
+    and Tag is, without keeping any of the text. A Sub-story is then read from the file and
+    compiled when it's first needed and the least recently used ones are dropped once there are
+    more than ``max_sections`` of them, which keeps the memory used by huge (eg: generated) sus
+    files low. It can be used anywhere a :class:`Script` can, however :attr:`text` reads the
+    whole file every time.
+
+    Parameters
+    -----------
+    path: :class:`str`
+            The path of the sus file, it must not change while the script is used.
+    max_sections: :class:`int`
+            The maximum amount of compiled Sub-stories to keep in memory.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import LazyScript, Story
+
+            story = Story(LazyScript("generated.sus", max_sections=128))
+    """
+
+    __slots__ = ("max_sections", "_index", "_digests", "_sections", "_lock")
+
+    max_sections: int
+    _index: Mapping[str, Tuple[int, int]]
+    # The hash of every Sub-story's lines, to tell which changed without reading the file again.
+    _digests: Mapping[str, bytes]
+    _sections: "OrderedDict[str, Tuple[Tuple[str, ...], Tuple[Instruction, ...]]]"
+    _lock: Lock
+
+    def __init__(self, path: str, max_sections: int = 64) -> None:
+        index: Dict[str, Tuple[int, int]] = dict()
+        digests: Dict[str, bytes] = dict()
+        section = sha256()
+        lengths: Dict[str, int] = dict()
+        tags: Dict[str, Tuple[str, int]] = dict()
+        variables: Dict[str, None] = {"attributes": None}
+        digest = sha256()
+        # The start and end of the last line that was read, in bytes.
+        position = [0, 0]
+
+        def read_lines(file: IO[bytes]) -> Iterator[str]:
+            for raw in file:
+                position[0], position[1] = position[1], position[1] + len(raw)
+                raw = raw.replace(b"\r\n", b"\n")
+                digest.update(raw.replace(b"\r", b"\n"))
+                yield raw.decode("UTF-8").rstrip("\n")
+
+        name = first = str()
+        start = 0
+        empty = True
+        with open(path, "rb") as f:
+            for i in _iter_merged(read_lines(f)):
+                empty = False
+                if "STORAGE " in i:
+                    variables.update(dict.fromkeys(_VARIABLE_PATTERN.findall(i)))
+                sub_story = _STORY_PATTERN.findall(i)
+                if sub_story or not name:
+                    tag = None if sub_story else _split_tag(i)[1]
+                    if tag is not None:
+                        raise StoryError(f"Tag {tag} comes before the first Sub-story")
+                    if name:
+                        index[name] = (start, position[0])
+                        digests[name] = section.digest()
+                        section = sha256()
+                    # Like Script, the lines before the first Sub-story are kept as a section
+                    # named after the first one.
+                    new = sub_story[0] if sub_story else i
+                    if new in lengths:
+                        raise StoryError(f"Duplicate 'Sub-story': {sub_story}")
+                    if sub_story and not first:
+                        first = new
+                    name, start = new, position[1]
+                    lengths[name] = 0
+                    continue
+                section.update(i.encode("UTF-8") + b"\n")
+                tag = _split_tag(i)[1]
+                if tag is not None:
+                    if tag in tags:
+                        raise StoryError(f"Duplicate Tag: {tag}")
+                    tags[tag] = (name, lengths[name])
+                lengths[name] += 1
+        if empty:
+            raise StoryError("Story file is empty")
+        if not first:
+            raise StoryError("No Story sections found")
+        index[name] = (start, position[1])
+        digests[name] = section.digest()
+        set_ = object.__setattr__
+        set_(self, "reference", path)
+        set_(self, "max_sections", max_sections)
+        set_(self, "_index", MappingProxyType(index))
+        set_(self, "_digests", MappingProxyType(digests))
+        set_(self, "_sections", OrderedDict())
+        set_(self, "_lock", Lock())
+        set_(self, "sub_stories", _Sections(self, 0))
+        set_(self, "code", _Sections(self, 1))
+        set_(self, "tags", MappingProxyType(tags))
+        set_(self, "first", first)
+        set_(self, "digest", digest.digest())
+        _link(self, variables, lengths)
+
+    @classmethod
+    def from_file(cls, path: str) -> "LazyScript":
+        """Opens a sus file lazily, the same as ``LazyScript(path)``."""
+        return cls(path)
+
+    @property
+    def text(self) -> Tuple[str, ...]:  # type: ignore[override]
+        """Every line of text in the sus file that isn't a comment / empty line, read from the file."""
+        with open(self.reference, "r", encoding="UTF-8") as sf:
+            return tuple(_merge_lines(sf.read()))
+
+    @property
+    def loaded(self) -> Tuple[str, ...]:
+        """The names of the Sub-stories that are in memory, from the least to most recently used."""
+        with self._lock:
+            return tuple(self._sections)
+
+    def _section(self, name: str) -> Tuple[Tuple[str, ...], Tuple[Instruction, ...]]:
+        with self._lock:
+            section = self._sections.get(name)
+            if section is not None:
+                self._sections.move_to_end(name)
+                return section
+            start, end = self._index[name]
+            with open(self.reference, "rb") as f:
+                f.seek(start)
+                source = f.read(end - start).decode("UTF-8")
+            lines = tuple(_split_tag(i)[0] for i in _merge_lines(source))
+            section = self._sections[name] = (lines, compile_lines(lines))
+            while len(self._sections) > self.max_sections:
+                self._sections.popitem(last=False)
+            return section
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        return (type(self), (self.reference, self.max_sections))
+
+
+class _Sections(Mapping):
+    # The sub_stories and code of a LazyScript, the Sub-stories are only loaded when accessed.
+
+    __slots__ = ("_script", "_item")
+
+    def __init__(self, script: LazyScript, item: int) -> None:
+        self._script = script
+        self._item = item
+
+    def __getitem__(self, name: str) -> Any:
+        return self._script._section(name)[self._item]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._script._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._script._index)
+
+    def __len__(self) -> int:
+        return len(self._script._index)
+
+
+def _restore(
+    reference: str,
+    text: Tuple[str, ...],
+    sub_stories: Dict[str, Tuple[str, ...]],
+    tags: Dict[str, Tuple[str, int]],
+    code: Dict[str, Tuple[Instruction, ...]],
+    first: str,
+    digest: bytes,
+    variables: Tuple[str, ...],
+) -> Script:
+    # Rebuilding a pickled Script without parsing it again.
+    script = object.__new__(Script)
+    set_ = object.__setattr__
+    set_(script, "reference", reference)
+    set_(script, "text", text)
+    set_(script, "sub_stories", MappingProxyType(sub_stories))
+    set_(script, "tags", MappingProxyType(tags))
+    set_(script, "code", MappingProxyType(code))
+    set_(script, "first", first)
+    set_(script, "digest", digest)
+    _link(script, variables)
+    return script
+
+
+def _link(
+    script: Script,
+    variables: Iterable[str],
+    lengths: Optional[Mapping[str, int]] = None,
+) -> None:
+    # Precomputing where every Sub-story starts and which comes after it, this way moving between
+    # them doesn't need to look through all of them.
+    names = tuple(script.code)
+    starts = list()
+    offset = 0
+    for name in names:
+        starts.append(offset)
+        offset += len(script.code[name]) if lengths is None else lengths[name]
+    set_ = object.__setattr__
+    set_(script, "successors", MappingProxyType(dict(zip(names, names[1:] + (None,)))))
+    set_(script, "offsets", MappingProxyType(dict(zip(names, starts))))
+    set_(script, "length", offset)
+    set_(script, "variables", tuple(variables))
+    set_(
+        script,
+        "slots",
+        MappingProxyType({name: i for i, name in enumerate(script.variables)}),
+    )
+    set_(script, "_names", names)
+    set_(script, "_starts", tuple(starts))
+    # The STORAGE and UTILS arguments parsed with this script's slots, filled in by its stories.
+    set_(script, "_commands", dict())
+    set_(script, "_expressions", dict())
+
+
+def _digest(source: str) -> bytes:
+    # Hashing the source the way it's read in text mode so "\r\n" files hash the same either way.
+    return sha256(
+        source.replace("\r\n", "\n").replace("\r", "\n").encode("UTF-8")
+    ).digest()
+
+
+def _find_variables(lines: Iterable[str]) -> Dict[str, None]:
+    # Finding the names used by STORAGE functions so every one can get a slot.
+    variables = {"attributes": None}
+    for i in lines:
+        if "STORAGE " in i:
+            variables.update(dict.fromkeys(_VARIABLE_PATTERN.findall(i)))
+    return variables
+
+
+def _split_tag(line: str) -> Tuple[str, Optional[str]]:
+    # Gets the name of the Tag a line makes if it does, "- TAG" lines are stored as "-TAG".
+    if not line.startswith(("-TAG", "- TAG")):
+        return line, None
+    if line.startswith("- "):
+        line = "-" + line[2:]
+    return line, line.split(" ", 2)[1]
+
+
+def _merge_lines(source: str) -> List[str]:
+    # Processing the raw text, disregarding comments and empty lines and merging function ones.
+    return list(_iter_merged(source.splitlines()))
+
+
+def _iter_merged(lines: Iterable[str]) -> Iterator[str]:
+    # The line by line version of _merge_lines, it only reads the next line when it's needed.
+    temp_lines = str()
+    for i in lines:
+        if i and not i.startswith("# "):
+            if i.startswith("-") and "{{" in i:
+                temp_lines = i.replace("{{", "")
+                if "}}" in i:
+                    temp_lines = temp_lines.replace("}}", "")
+                    yield temp_lines.strip()
+                    temp_lines = str()
+                continue
+            if temp_lines:
+                if "}}" in i:
+                    temp_lines += i.replace("}}", "")
+                    yield temp_lines.strip()
+                    temp_lines = str()
+                    continue
+                temp_lines += i
+                continue
+            yield i.strip()  # Making sure that there's no padding in the lines.
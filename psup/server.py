@@ -0,0 +1,273 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from asyncio import (
+    AbstractServer,
+    CancelledError,
+    StreamReader,
+    StreamWriter,
+    Task,
+    TimeoutError as AsyncTimeoutError,
+    current_task,
+    gather,
+    start_server,
+    wait_for,
+)
+from typing import Any, List, Optional, Set, Tuple, Type
+
+from .backends import _format, expects_answer
+from .errors import StoryError
+from .script import Script
+from .story import Story
+
+
+class StreamIO:
+    """An I/O function that plays a :class:`Story` over an asyncio stream with a line protocol.
+
+    .. versionadded:: 1.0.0
+
+    The story is sent as UTF-8 lines, options as ``1) name`` lines and errors as lines starting
+    with ``"! "``. Whenever an answer is expected the last line sent is ``"> "`` and the next line
+    received is the answer.
+
+    Lines that don't expect an answer are buffered and sent together with the next prompt (or
+    once ``write_buffer`` bytes are buffered), each send waits for the stream to drain so a slow
+    player pauses their own story instead of filling the server's memory.
+
+    Parameters
+    -----------
+    reader: :class:`asyncio.StreamReader`
+            The stream the answers are read from.
+    writer: :class:`asyncio.StreamWriter`
+            The stream the story is written to.
+    idle_timeout: Optional[:class:`float`]
+            The amount of seconds to wait for an answer before raising :exc:`asyncio.TimeoutError`.
+    write_buffer: :class:`int`
+            The amount of bytes buffered before they're sent without waiting for a prompt.
+    """
+
+    def __init__(
+        self,
+        reader: StreamReader,
+        writer: StreamWriter,
+        idle_timeout: Optional[float] = 300.0,
+        write_buffer: int = 4096,
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.idle_timeout = idle_timeout
+        self.write_buffer = write_buffer
+        self._buffer: List[str] = list()
+        self._size = 0
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        if "error" in kwargs:
+            await self.write(f"! {kwargs['error']}\n")
+            return ""
+        if not expects_answer(text, **kwargs):
+            await self.write(_format(text, **kwargs) + "\n")
+            return ""
+        message = _format(text, **kwargs)
+        if "options" in kwargs:
+            message += "\n> "
+        await self.write(message + "\n")
+        await self.flush()
+        line = await wait_for(self.reader.readline(), self.idle_timeout)
+        if not line:
+            raise ConnectionResetError("The player disconnected")
+        return line.decode("UTF-8", "replace").rstrip("\r\n")
+
+    async def write(self, text: str) -> None:
+        """Buffers text, sending the buffer if it's full."""
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.write_buffer:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Sends the buffered text and waits for the stream to drain."""
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("UTF-8")
+        self._buffer.clear()
+        self._size = 0
+        self.writer.write(data)
+        await self.writer.drain()
+
+
+class StoryServer:
+    """Serves a story to remote players, every connection plays its own :class:`Story`.
+
+    .. versionadded:: 1.0.0
+
+    Connections use the line protocol of :class:`StreamIO` so any line based client (even
+    ``telnet`` or ``nc``) can play. Connections are closed when their story ends or fails, when
+    their player doesn't answer for ``idle_timeout`` seconds or when the server is closed.
+
+    Parameters
+    -----------
+    script: :class:`Script`
+            The script every connection plays.
+    host: Optional[:class:`str`]
+            The host to listen on, every interface if ``None``.
+    port: :class:`int`
+            The port to listen on, ``0`` picks a free one, see :attr:`address`.
+    max_connections: Optional[:class:`int`]
+            The maximum amount of players at once, players connecting after it's reached are told
+            the server is full and disconnected.
+    idle_timeout: Optional[:class:`float`]
+            The amount of seconds a player has to answer.
+    write_buffer: :class:`int`
+            The write buffer size of every connection, see :class:`StreamIO`.
+    story_class: Type[:class:`Story`]
+            The class of the stories made for every connection.
+    backlog: :class:`int`
+            The amount of connections waiting to be accepted, players connecting in bursts get
+            refused by the OS once it's full.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            import asyncio
+            from psup import Script
+            from psup.server import StoryServer
+
+            async def main():
+                async with StoryServer(Script.from_file("story.sus"), port=8023) as server:
+                    await server.serve_forever()
+
+            asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        script: Script,
+        host: Optional[str] = None,
+        port: int = 0,
+        max_connections: Optional[int] = None,
+        idle_timeout: Optional[float] = 300.0,
+        write_buffer: int = 4096,
+        story_class: Type[Story] = Story,
+        backlog: int = 1024,
+    ) -> None:
+        self.script = script
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.write_buffer = write_buffer
+        self.story_class = story_class
+        self.backlog = backlog
+        self._server: Optional[AbstractServer] = None
+        self._address: Optional[Tuple[str, int]] = None
+        self._tasks: "Set[Task[Any]]" = set()
+
+    @property
+    def connections(self) -> int:
+        """The amount of players connected."""
+        return len(self._tasks)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The host and port the server listens on, useful when it was started on port ``0``."""
+        if self._address is None:
+            raise RuntimeError("The server isn't started")
+        return self._address
+
+    async def start(self) -> None:
+        """Starts listening for connections."""
+        if self._server is None:
+            server = await start_server(
+                self._handle, self.host, self.port, backlog=self.backlog
+            )
+            self._address = server.sockets[0].getsockname()[:2]
+            self._server = server
+
+    async def serve_forever(self) -> None:
+        """Starts the server if it isn't started and serves until it's closed or cancelled."""
+        await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops listening and disconnects every player."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = self._address = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "StoryServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        io = StreamIO(reader, writer, self.idle_timeout, self.write_buffer)
+        if (
+            self.max_connections is not None
+            and self.connections >= self.max_connections
+        ):
+            try:
+                await self._send(io, "The server is full, try again later")
+            finally:
+                writer.close()
+            return
+        task = current_task()
+        assert task is not None
+        self._tasks.add(task)
+        try:
+            reason: Optional[str] = None
+            try:
+                await self.story_class(self.script, io).astart()
+            except AsyncTimeoutError:
+                reason = "Timed out"
+            except CancelledError:
+                # Closed by the server, the task is its own so it's not cancelled any further.
+                reason = "The server is closing"
+            except StoryError as error:
+                reason = str(
+                    error.args[0]
+                )  # A broken script, telling the player what happened.
+            except (ConnectionError, ValueError):
+                pass  # The player left or sent a line longer than the stream's limit.
+            await self._send(io, reason)
+        finally:
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _send(self, io: StreamIO, reason: Optional[str]) -> None:
+        # Sending what's left in the buffer before the connection is closed.
+        try:
+            if reason is not None:
+                await io.write(f"! {reason}\n")
+            await io.flush()
+        except ConnectionError:
+            pass
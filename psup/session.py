@@ -0,0 +1,256 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from asyncio import Queue, Semaphore, Task, gather, get_running_loop, sleep
+from time import monotonic
+from typing import Any, Dict, Hashable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from .script import Script
+from .story import Story
+
+
+class Message(NamedTuple):
+    """A message sent by a :class:`Story` through a :class:`QueueIO`.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    text: Optional[:class:`str`]
+            The story text.
+    options: Optional[Tuple[:class:`str`, ...]]
+            The options the player has to choose one of.
+    error: Optional[:class:`str`]
+            A player related error, these messages don't expect an answer.
+    """
+
+    text: Optional[str]
+    options: Optional[Tuple[str, ...]]
+    error: Optional[str]
+
+
+class QueueIO:
+    """An I/O function that passes a :class:`Story` object's I/O through asyncio queues.
+
+    .. versionadded:: 1.0.0
+
+    Every message except errors waits for an answer to be put in :attr:`input`, since both
+    queues are bounded a story never gets ahead of the player reading it.
+
+    Parameters
+    -----------
+    maxsize: :class:`int`
+            The maximum amount of messages waiting in each queue.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        self.output: "Queue[Optional[Message]]" = Queue(maxsize)
+        self.input: "Queue[str]" = Queue(maxsize)
+
+    async def __call__(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        options = kwargs.get("options")
+        error = kwargs.get("error")
+        await self.output.put(
+            Message(text, tuple(options) if options is not None else None, error)
+        )
+        if error is not None:
+            return ""
+        return await self.input.get()
+
+
+class StorySession:
+    """A :class:`Story` being played by one player of a :class:`SessionManager`.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    key: Hashable
+            The key of the session in its manager, usually the player's id.
+    story: :class:`Story`
+            The story being played.
+    io: :class:`QueueIO`
+            The story's I/O function.
+    last_active: :class:`float`
+            The :func:`time.monotonic` time of the player's last answer.
+    """
+
+    def __init__(self, key: Hashable, story: Story, queue_size: int = 16) -> None:
+        self.key = key
+        self.story = story
+        self.io = QueueIO(queue_size)
+        story.io = self.io
+        self.last_active = monotonic()
+        self.task: "Optional[Task[None]]" = None
+
+    async def receive(self) -> Optional[Message]:
+        """Waits for the next message of the story, returns ``None`` once the story is over."""
+        if self.done and self.io.output.empty():
+            return None
+        return await self.io.output.get()
+
+    async def send(self, text: str) -> None:
+        """Sends the player's answer to the story."""
+        self.last_active = monotonic()
+        await self.io.input.put(text)
+
+    def cancel(self) -> None:
+        """Stops the story."""
+        if self.task is not None:
+            self.task.cancel()
+
+    @property
+    def done(self) -> bool:
+        """Whether the story is over, cancelled or failed."""
+        return self.task is not None and self.task.done()
+
+    async def _run(self) -> None:
+        try:
+            await self.story.astart()
+        finally:
+            if not self.io.output.full():
+                # Waking up a receive call waiting for a message that will never come.
+                self.io.output.put_nowait(None)
+
+
+class SessionManager:
+    """Runs many :class:`Story` objects at once on the running event loop.
+
+    .. versionadded:: 1.0.0
+
+    Parameters
+    -----------
+    idle_timeout: Optional[:class:`float`]
+            The amount of seconds a session is cancelled after if its player doesn't answer.
+    max_sessions: Optional[:class:`int`]
+            The maximum amount of sessions running at once, :meth:`start` waits for a free slot
+            once it's reached.
+    queue_size: :class:`int`
+            The size of every session's message queues.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup import Script, SessionManager, Story
+
+            script = Script.from_file("story.sus")
+
+            async def on_join(manager, player_id):
+                session = await manager.start(player_id, Story(script))
+                print(await session.receive())
+
+            async def on_message(manager, player_id, text):
+                session = manager.get(player_id)
+                await session.send(text)
+                print(await session.receive())
+    """
+
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        queue_size: int = 16,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.queue_size = queue_size
+        self.sessions: Dict[Hashable, StorySession] = dict()
+        self._slots = Semaphore(max_sessions) if max_sessions else None
+        self._reaper: "Optional[Task[None]]" = None
+
+    async def start(self, key: Hashable, story: Union[Story, Script]) -> StorySession:
+        """Starts a new session.
+
+        Parameters
+        -----------
+        key: Hashable
+                The key of the session, usually the player's id.
+        story: Union[:class:`Story`, :class:`Script`]
+                The story to play, a new :class:`Story` is made if a :class:`Script` is passed.
+        """
+        if key in self.sessions:
+            raise ValueError(f"Session {key!r} already exists")
+        if self._slots is not None:
+            await self._slots.acquire()
+            # Another session could've been started with the key while waiting for a slot.
+            if key in self.sessions:
+                self._slots.release()
+                raise ValueError(f"Session {key!r} already exists")
+        session = StorySession(
+            key, Story(story) if isinstance(story, Script) else story, self.queue_size
+        )
+        self.sessions[key] = session
+        session.task = get_running_loop().create_task(session._run())
+        session.task.add_done_callback(lambda _: self._remove(session))
+        if self.idle_timeout is not None and self._reaper is None:
+            self._reaper = get_running_loop().create_task(self._reap(self.idle_timeout))
+        return session
+
+    def get(self, key: Hashable) -> Optional[StorySession]:
+        """Gets a running session by its key."""
+        return self.sessions.get(key)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancels a session, returns whether it existed."""
+        session = self.sessions.get(key)
+        if session is None:
+            return False
+        session.cancel()
+        return True
+
+    async def close(self) -> None:
+        """Cancels every session and waits for them to stop."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        tasks = [i.task for i in self.sessions.values() if i.task is not None]
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self) -> Iterator[StorySession]:
+        return iter(list(self.sessions.values()))
+
+    async def __aenter__(self) -> "SessionManager":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _remove(self, session: StorySession) -> None:
+        if self.sessions.get(session.key) is session:
+            del self.sessions[session.key]
+        if self._slots is not None:
+            self._slots.release()
+
+    async def _reap(self, timeout: float) -> None:
+        while True:
+            await sleep(timeout / 4)
+            now = monotonic()
+            for session in list(self.sessions.values()):
+                if now - session.last_active > timeout:
+                    session.cancel()
@@ -0,0 +1,348 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from random import Random
+from typing import (
+    Any,
+    Awaitable,
+    List,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .errors import StoryError
+from .script import Script
+from .story import Story
+
+T = TypeVar("T")
+Position = Tuple[str, int]
+
+
+class _Chooser(Random):
+    # A random number generator that takes every choice from a list of decisions (or at random if
+    # there's none), the exhaustive mode uses it to go through every path.
+
+    def __init__(self, seed: int, decisions: Optional[Sequence[int]]) -> None:
+        super().__init__(seed)
+        self.decisions = decisions
+        self.made: List[Tuple[int, int]] = list()
+
+    def decide(self, options: int) -> int:
+        if self.decisions is None:
+            decision = self.randrange(options)
+        elif len(self.made) < len(self.decisions):
+            decision = self.decisions[len(self.made)]
+        else:
+            decision = 0
+        self.made.append((decision, options))
+        return decision
+
+    def choice(self, seq: Sequence[T]) -> T:  # type: ignore[override]
+        return seq[self.decide(len(seq))]
+
+
+class _SimulatedStory(Story):
+    # A story that plays itself, it never really waits so it's ran without an event loop.
+
+    def __init__(
+        self,
+        script: Script,
+        rng: _Chooser,
+        inputs: Sequence[str],
+        positions: Set[Position],
+    ) -> None:
+        super().__init__(script, self._answer)
+        self.rng = rng
+        self.inputs = inputs
+        self.positions = positions
+        self.ending: Optional[Position] = None
+
+    async def _answer(self, text: Optional[str] = None, **kwargs: Any) -> str:
+        if "options" in kwargs:
+            return str(self.rng.decide(len(list(kwargs["options"]))) + 1)
+        if text is not None and text.endswith("\n> ") and self.inputs:
+            return self.rng.choice(self.inputs)
+        return ""
+
+    async def end(self) -> None:
+        self.ending = (self.sub_story, self.line)
+        self.ended = True
+
+    def play(
+        self, max_steps: int, window: int
+    ) -> Tuple[int, Optional[Position], Set[Position]]:
+        # Returns the amount of steps, the ending and the lines of a suspected infinite loop.
+        add = self.positions.add
+        steps = 0
+        while not self.ended and steps < max_steps:
+            add((self.sub_story, self.line))
+            _drive(self._step())
+            steps += 1
+        loop: Set[Position] = set()
+        # Playing a bit more to see which lines it keeps going through, if it didn't end.
+        for _ in range(window):
+            if self.ended:
+                break
+            loop.add((self.sub_story, self.line))
+            _drive(self._step())
+        return steps, self.ending, loop
+
+
+def _drive(awaitable: Optional[Awaitable[T]]) -> Optional[T]:
+    # Running what a line had to wait for, which never really suspends, without the overhead of
+    # an event loop, lines that didn't wait for anything give None.
+    if awaitable is None:
+        return None
+    coroutine = awaitable.__await__()
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    else:
+        coroutine.close()
+        raise RuntimeError("Simulated stories can't wait for anything")
+
+
+class SimulationReport:
+    """The results of :func:`simulate`.
+
+    .. versionadded:: 1.0.0
+
+    Attributes
+    -----------
+    script: :class:`Script`
+            The simulated script.
+    runs: :class:`int`
+            The amount of playthroughs.
+    steps: :class:`int`
+            The total amount of lines ran in all playthroughs.
+    endings: Counter[Tuple[:class:`str`, :class:`int`]]
+            How many playthroughs ended on every line.
+    errors: Counter[:class:`str`]
+            How many playthroughs failed with every error, eg: a jump to a missing tag.
+    loops: Counter[Tuple[:class:`str`, :class:`int`]]
+            The lines of playthroughs which didn't end in ``max_steps`` lines and how many of them
+            kept going through each, these are probably infinite loops.
+    visited: Set[Tuple[:class:`str`, :class:`int`]]
+            Every line that was ran at least once.
+    """
+
+    def __init__(self, script: Script) -> None:
+        self.script = script
+        self.runs = 0
+        self.steps = 0
+        self.endings: "Counter[Position]" = Counter()
+        self.errors: "Counter[str]" = Counter()
+        self.loops: "Counter[Position]" = Counter()
+        self.visited: Set[Position] = set()
+
+    @property
+    def average_steps(self) -> float:
+        """The average amount of lines ran per playthrough."""
+        return self.steps / self.runs if self.runs else 0.0
+
+    @property
+    def unreachable(self) -> List[Position]:
+        """The lines no playthrough ran, in the order they're in the script."""
+        return [
+            (name, line)
+            for name, lines in self.script.code.items()
+            for line in range(len(lines))
+            if (name, line) not in self.visited
+        ]
+
+    def merge(self, other: "SimulationReport") -> None:
+        """Adds the results of another report of the same script to this one."""
+        self.runs += other.runs
+        self.steps += other.steps
+        self.endings.update(other.endings)
+        self.errors.update(other.errors)
+        self.loops.update(other.loops)
+        self.visited |= other.visited
+
+    def __str__(self) -> str:
+        lines = [
+            f"Playthroughs: {self.runs}",
+            f"Average length: {self.average_steps:.1f} lines",
+            "Endings:",
+        ]
+        for (name, line), count in self.endings.most_common():
+            lines.append(f"  {name}:{line} {count / self.runs:.1%}")
+        if self.errors:
+            lines.append("Errors:")
+            lines.extend(
+                f"  {error} ({count})" for error, count in self.errors.most_common()
+            )
+        if self.loops:
+            lines.append("Possible infinite loops through:")
+            lines.extend(
+                f"  {name}:{line}" for (name, line), _ in self.loops.most_common(10)
+            )
+        unreachable = self.unreachable
+        lines.append(f"Unreachable lines: {len(unreachable)}")
+        lines.extend(f"  {name}:{line}" for name, line in unreachable[:20])
+        return "\n".join(lines)
+
+
+def _play(
+    report: SimulationReport,
+    seed: int,
+    decisions: Optional[Sequence[int]],
+    inputs: Sequence[str],
+    max_steps: int,
+    window: int,
+) -> List[Tuple[int, int]]:
+    # Plays once, adding the results to the report and returning the decisions that were made.
+    rng = _Chooser(seed, decisions)
+    story = _SimulatedStory(report.script, rng, inputs, report.visited)
+    report.runs += 1
+    try:
+        steps, ending, loop = story.play(max_steps, window)
+    except StoryError as e:
+        report.errors[str(e.args[0])] += 1
+        return rng.made
+    except Exception as e:
+        report.errors[repr(e)] += 1
+        return rng.made
+    report.steps += steps
+    if ending is not None:
+        report.endings[ending] += 1
+    report.loops.update(loop)
+    return rng.made
+
+
+def _simulate_random(
+    script: Script,
+    seeds: range,
+    inputs: Sequence[str],
+    max_steps: int,
+    window: int,
+) -> SimulationReport:
+    report = SimulationReport(script)
+    for seed in seeds:
+        _play(report, seed, None, inputs, max_steps, window)
+    return report
+
+
+def _simulate_exhaustive(
+    script: Script,
+    seed: int,
+    inputs: Sequence[str],
+    max_steps: int,
+    window: int,
+    max_runs: int,
+) -> SimulationReport:
+    # Going through every combination of choices depth first, every run follows the decisions
+    # it's given and then picks the first option of every other choice.
+    report = SimulationReport(script)
+    pending: MutableSequence[List[int]] = [[]]
+    while pending and report.runs < max_runs:
+        decisions = pending.pop()
+        made = _play(report, seed, decisions, inputs, max_steps, window)
+        for i in range(len(made) - 1, len(decisions) - 1, -1):
+            prefix = [decision for decision, _ in made[:i]]
+            pending.extend(prefix + [option] for option in range(made[i][1] - 1, 0, -1))
+    return report
+
+
+def simulate(
+    script: Union[Script, str],
+    runs: int = 10000,
+    exhaustive: bool = False,
+    max_steps: int = 10000,
+    inputs: Sequence[str] = ("",),
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> SimulationReport:
+    """Plays a story many times without a player to test it.
+
+    .. versionadded:: 1.0.0
+
+    Options and the ``RANDOM`` and ``UTILS RAND`` functions are picked at random, the playthroughs
+    are split between a pool of processes and don't have any I/O delay.
+
+    .. note::
+        Custom functions aren't available in simulations.
+
+    Parameters
+    -----------
+    script: Union[:class:`Script`, :class:`str`]
+            The script or the path of the sus file to simulate.
+    runs: :class:`int`
+            The amount of playthroughs, the maximum amount in exhaustive mode.
+    exhaustive: :class:`bool`
+            Whether to go through every combination of options and ``RANDOM`` choices instead of
+            picking them at random, this is done in a single process.
+    max_steps: :class:`int`
+            The amount of lines after which a playthrough is considered an infinite loop.
+    inputs: Sequence[:class:`str`]
+            The answers ``UTILS INPUT`` is given at random.
+    seed: :class:`int`
+            The seed of the first playthrough, every other one adds one to it.
+    workers: Optional[:class:`int`]
+            The amount of processes to use, defaults to the amount of CPU cores.
+
+    Example
+    -----------
+    .. code-block:: python3
+
+            from psup.simulator import simulate
+
+            print(simulate("atlas/imposter.sus", runs=50000))
+    """
+    if isinstance(script, str):
+        script = Script.from_file(script)
+    window = 64
+    if exhaustive:
+        return _simulate_exhaustive(script, seed, inputs, max_steps, window, runs)
+    workers = min(workers or cpu_count() or 1, max(1, runs // 1000))
+    if workers <= 1:
+        return _simulate_random(
+            script, range(seed, seed + runs), inputs, max_steps, window
+        )
+    report = SimulationReport(script)
+    size = -(-runs // workers)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                _simulate_random,
+                script,
+                range(start, min(start + size, seed + runs)),
+                inputs,
+                max_steps,
+                window,
+            )
+            for start in range(seed, seed + runs, size)
+        ]
+        for future in futures:
+            report.merge(future.result())
+    return report
@@ -0,0 +1,128 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from json import dumps, loads
+from marshal import dumps as marshal_dumps
+from marshal import loads as marshal_loads
+from struct import Struct, error
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+
+from .errors import StoryError
+
+# Bumped whenever the layout of the state changes, older snapshots are still loaded.
+SNAPSHOT_VERSION = 1
+_MAGIC = b"PSS"
+# magic, version, the first bytes of the script's digest.
+_HEADER = Struct("<3sB8s")
+
+
+class State(NamedTuple):
+    """The mutable state of a :class:`Story`, everything else comes from its :class:`Script`.
+
+    .. versionadded:: 1.0.0
+    """
+
+    sub_story: str
+    line: int
+    ended: bool
+    storage: Dict[str, Any]
+    attributes: List[str]
+
+
+def dump(state: State, digest: bytes, as_json: bool = False) -> Union[bytes, str]:
+    """Serializes a :class:`State` along with the digest of the script it belongs to.
+
+    .. versionadded:: 1.0.0
+
+    The binary form is a small header followed by the :mod:`marshal` ed state, the json form is
+    meant for places that only take text.
+    """
+    if as_json:
+        try:
+            return dumps(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "script": digest[:8].hex(),
+                    "sub_story": state.sub_story,
+                    "line": state.line,
+                    "ended": state.ended,
+                    "storage": state.storage,
+                    "attributes": state.attributes,
+                },
+                separators=(",", ":"),
+            )
+        except (TypeError, ValueError):
+            raise StoryError(
+                "Only text and numbers can be stored in a snapshot"
+            ) from None
+    try:
+        body = marshal_dumps(tuple(state), 4)
+    except ValueError:
+        raise StoryError("Only text and numbers can be stored in a snapshot") from None
+    return _HEADER.pack(_MAGIC, SNAPSHOT_VERSION, digest[:8]) + body
+
+
+def load(data: Union[bytes, str]) -> Tuple[bytes, State]:
+    """Deserializes a snapshot made by :func:`dump`.
+
+    .. versionadded:: 1.0.0
+
+    Returns the first bytes of the script's digest and the :class:`State`.
+    """
+    try:
+        if isinstance(data, str):
+            raw: Any = loads(data)
+            version = raw["version"]
+            digest = bytes.fromhex(raw["script"])
+            fields: Any = (
+                raw["sub_story"],
+                raw["line"],
+                raw["ended"],
+                raw["storage"],
+                raw["attributes"],
+            )
+        else:
+            magic, version, digest = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError
+            fields = marshal_loads(data[_HEADER.size :])
+        if len(digest) != 8:
+            raise ValueError
+        if version > SNAPSHOT_VERSION:
+            raise StoryError(f"Unsupported snapshot version: {version}")
+        state = State(*fields)
+        # Checking the state is what dump makes, so a broken one can't break the story later.
+        if not (
+            isinstance(state.sub_story, str)
+            and type(state.ended) is bool
+            and isinstance(state.storage, dict)
+            and all(isinstance(i, str) for i in state.storage)
+            and "attributes" not in state.storage
+            and isinstance(state.attributes, list)
+            and all(isinstance(i, str) for i in state.attributes)
+        ):
+            raise ValueError
+    except (ValueError, KeyError, TypeError, EOFError, error):
+        raise StoryError("Invalid snapshot") from None
+    return digest, state
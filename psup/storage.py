@@ -0,0 +1,204 @@
+"""
+MIT License
+
+Copyright (c) 2021-present EnokiUN
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    KeysView,
+    List,
+    Mapping,
+    MutableMapping,
+)
+
+
+class Attributes:
+    """The attributes the player has gained, an insertion ordered set of strings.
+
+    .. versionadded:: 1.0.0
+
+    Checking for an attribute takes the same time no matter how many there are, it still supports
+    the list methods (``append``, ``remove``, indexing) of the list it replaced.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, attributes: Iterable[str] = ()) -> None:
+        self._items: Dict[str, None] = dict.fromkeys(attributes)
+
+    def add(self, attribute: str) -> None:
+        """Adds an attribute, does nothing if it's already there."""
+        self._items[attribute] = None
+
+    append = add
+
+    def update(self, attributes: Iterable[str]) -> None:
+        """Adds many attributes."""
+        self._items.update(dict.fromkeys(attributes))
+
+    def discard(self, attribute: str) -> None:
+        """Removes an attribute, does nothing if it isn't there."""
+        self._items.pop(attribute, None)
+
+    def remove(self, attribute: str) -> None:
+        """Removes an attribute, raises :exc:`ValueError` if it isn't there."""
+        try:
+            del self._items[attribute]
+        except KeyError:
+            raise ValueError(f"{attribute!r} not in attributes") from None
+
+    def clear(self) -> None:
+        """Removes every attribute."""
+        self._items.clear()
+
+    def copy(self) -> "Attributes":
+        """Returns a copy of the attributes."""
+        copy = Attributes()
+        copy._items = self._items.copy()
+        return copy
+
+    def view(self) -> KeysView[str]:
+        """A set-like view of the attributes for batch checks, eg: ``attrs.view() >= {"a", "b"}``."""
+        return self._items.keys()
+
+    def __contains__(self, attribute: object) -> bool:
+        return attribute in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> str:
+        return list(self._items)[index]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Attributes):
+            return list(self._items) == list(other._items)
+        if isinstance(other, (list, tuple)):
+            return list(self._items) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Attributes({list(self._items)!r})"
+
+
+# Marks the slots of variables that weren't set yet.
+_UNSET: Any = object()
+_NO_SLOTS: Mapping[str, int] = MappingProxyType({})
+
+
+class Storage(MutableMapping[str, Any]):
+    """The variables of a story, a dict-like mapping of names to values.
+
+    .. versionadded:: 1.0.0
+
+    The variables a :class:`Script` uses are found when it's parsed and every one of them gets a
+    slot number, the names and slots are shared by every story of the script and only the values
+    are kept by every story in a list. This makes a storage small and quick to copy, variables
+    that weren't found when parsing (eg: set by custom functions) are kept in a dict instead.
+
+    Parameters
+    -----------
+    slots: Mapping[:class:`str`, :class:`int`]
+            The slot of every variable, usually :attr:`Script.slots`.
+    """
+
+    __slots__ = ("slots", "_values", "_extra")
+
+    def __init__(self, slots: Mapping[str, int] = _NO_SLOTS) -> None:
+        self.slots = slots
+        self._values: List[Any] = [_UNSET] * len(slots)
+        self._extra: Dict[str, Any] = dict()
+
+    def load(self, slot: int, default: Any = None) -> Any:
+        """Gets the value of a slot or ``default`` if it wasn't set."""
+        value = self._values[slot]
+        return default if value is _UNSET else value
+
+    def store(self, slot: int, value: Any) -> None:
+        """Sets the value of a slot."""
+        self._values[slot] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = self.slots.get(key)
+        if slot is None:
+            return self._extra.get(key, default)
+        value = self._values[slot]
+        return default if value is _UNSET else value
+
+    def copy(self) -> "Storage":
+        """Returns a shallow copy of the storage, the same as :meth:`dict.copy`."""
+        copy = Storage.__new__(Storage)
+        copy.slots = self.slots
+        copy._values = self._values.copy()
+        copy._extra = self._extra.copy()
+        return copy
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self.slots.get(key)
+        if slot is None:
+            return self._extra[key]
+        value = self._values[slot]
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        slot = self.slots.get(key)
+        if slot is None:
+            self._extra[key] = value
+        else:
+            self._values[slot] = value
+
+    def __delitem__(self, key: str) -> None:
+        slot = self.slots.get(key)
+        if slot is None:
+            del self._extra[key]
+        elif self._values[slot] is _UNSET:
+            raise KeyError(key)
+        else:
+            self._values[slot] = _UNSET
+
+    def __contains__(self, key: object) -> bool:
+        slot = self.slots.get(key)  # type: ignore[call-overload]
+        if slot is None:
+            return key in self._extra
+        return self._values[slot] is not _UNSET
+
+    def __iter__(self) -> Iterator[str]:
+        values = self._values
+        for key, slot in self.slots.items():
+            if values[slot] is not _UNSET:
+                yield key
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self._values) - self._values.count(_UNSET) + len(self._extra)
+
+    def __repr__(self) -> str:
+        return f"Storage({dict(self.items())!r})"
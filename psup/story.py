@@ -22,49 +22,138 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from asyncio import run, sleep
-from inspect import ismethod
+import random
+from asyncio import AbstractEventLoop, Future, get_running_loop, run, shield
+from inspect import isawaitable, ismethod
 from os import name, system
-from random import choice, randrange, uniform
-from re import findall, split, sub
-from sys import stdout
-from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, Protocol, Tuple, Union
-
+from types import MappingProxyType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from .backends import TerminalIO
+from .cache import load_script
+from .compiler import (
+    Call,
+    Command,
+    Text,
+    compile_line,
+    parse_attribute_check,
+    parse_attributes,
+    parse_call,
+    parse_choices,
+    parse_options,
+    parse_text,
+)
 from .errors import StoryError
+from .expressions import (
+    Assign,
+    Comparison,
+    Expression,
+    Invoke,
+    Lookup,
+    Operation,
+    Value,
+    calculate,
+    compare,
+    literal,
+    parse_inline,
+    parse_storage,
+    parse_utils,
+    resolve,
+)
+from .script import Script
+from .snapshot import State, dump, load
+from .storage import _NO_SLOTS, Attributes, Storage
+
+
+StoryT = TypeVar("StoryT", bound="Story")
+# The loads currently running in Story.aload.
+_loading: Dict[Tuple[AbstractEventLoop, type, str], "Future[Script]"] = dict()
 
 
 class IoFunction(Protocol):
     def __call__(self, text: Optional[str] = None, **kwargs: Union[str, Iterable[str]]) -> Coroutine[Any, Any, str]: ...
 
-async def _story_io(text: Optional[str] = None, **kwargs: Union[str, Iterable[str]]) -> str:
-    """The default I/O (input and output) function for the :class:`Story` class
+# The default I/O (input and output) function for the :class:`Story` class.
+_story_io = TerminalIO()
 
-    .. versionadded:: 0.1.1
 
-    Parameters
-    -----------
-    text: Optional[:class:`str`]
-            The story script and text to be sent to the desired location.
-    options: List[:class:`str`]
-            The options to be displayed for the user / player to choose one.
-    error: :class:`str`
-            The player /user action relatted error for handling small mistakes like wrong input.
-    """
-    if "error" in kwargs:
-        print(kwargs["error"])
-        return ""
-    out = ""
-    if "options" in kwargs:
-        text = "Choose one:\n" + "\n".join(
-            [f"{x+1}) {i}" for x, i in enumerate(kwargs["options"])]
-        )
-        out = "\n> "
-    if text is not None:
-        for x in text:
-            print(x, end="")
-            stdout.flush()
-            await sleep(uniform(0, 0.01))
-    return input(out)
+# The types functions usually return, checked first since isawaitable is slow for them.
+_RESULT_TYPES = frozenset((str, int, float, bool, type(None)))
+# Marks the operands that weren't evaluated yet.
+_UNSET: Any = object()
+# How many parsed STORAGE and UTILS arguments are kept with their slots before starting over.
+_MAX_RESOLVED = 4096
+
+
+def _pending(value: Any) -> bool:
+    # Whether a function returned something to await instead of its result.
+    return type(value) not in _RESULT_TYPES and isawaitable(value)
+
+
+async def _settle(awaitable: Awaitable[Any]) -> Any:
+    ret = await awaitable
+    return ret if ret is not None else ""
+
+
+def _remember(resolved: Dict[Any, Any], key: Any, expression: Any) -> Any:
+    # Keeping a resolved STORAGE or UTILS argument, starting over if too many were kept so scripts
+    # that are too big to parse at once (see LazyScript) don't keep all of them.
+    if len(resolved) >= _MAX_RESOLVED:
+        resolved.clear()
+    resolved[key] = expression
+    return expression
+
+
+def _discard(value: Any) -> Optional[Awaitable[None]]:
+    # Drops the result of a function, still returning something to await if it has to wait.
+    return _wait(value) if _pending(value) else None
+
+
+async def _wait(awaitable: Awaitable[Any]) -> None:
+    await awaitable
+
+
+class _Dispatch(NamedTuple):
+    function: Callable[..., Any]
+    # Whether the story has to be passed to the function, it doesn't for bound methods.
+    pass_story: bool
+    # Whether the function takes arguments, None if it takes an invalid amount of parameters.
+    takes_args: Optional[bool]
+
+
+def _dispatch(function: Callable[..., Any]) -> _Dispatch:
+    # Working out how a function is called once when it's added instead of every time it's ran.
+    return _Dispatch(
+        function,
+        not ismethod(function),
+        {1: False, 2: True}.get(function.__code__.co_argcount),
+    )
+
+
+def _function_table(cls: Any) -> Mapping[str, _Dispatch]:
+    return MappingProxyType(
+        {
+            name: _dispatch(getattr(cls, attr))
+            for name, attr in cls._builtin_function_names.items()
+        }
+    )
 
 
 class Story:
@@ -77,6 +166,9 @@ class Story:
     reference: :class:`str`
             A String representing the reference of the story, it can be the path of the sus file that the
             story object will interpret and run or the story scrip directly.
+    script: :class:`Script`
+            The parsed sus file, a :class:`Script` can also be passed instead of the reference to share
+            it between many :class:`Story` objects.
     io: :class:`IoFunction`
             A function that handles the input and output of data from the :class:`Story`
             object to the desired location.
@@ -84,20 +176,27 @@ class Story:
             The Integer representing the current line number in the current Sub-story.
     sub_story: :class:`str`
             The Sting representing the current Sub-story.
-    sub_stories:  Dict[:class:`str`, List[:str:`]]
+    sub_stories:  Mapping[:class:`str`, Tuple[:str:`, ...]]
         A dictionary which has a list of Sub-stories and their lines.
     function_dict: Dict[:class:`str`, Callable[[Union[:class:`str`, None]], None]]
             The Dictionary that has the pairs of all function names and their corresponding python functions.
-    tags: Dict[:class:`str`, Itterable[:class:`str`, :class:`int`]]
+            Use :meth:`custom_function` to add to it, functions can also be set in it directly.
+            It's only made when it's first used, stories that don't use it share the built-in
+            functions of their class.
+    tags: Mapping[:class:`str`, Itterable[:class:`str`, :class:`int`]]
             The Dictionary containing all the tags and their corresponding Lists that contain the name of
             their Sub-story and the line they're in.
-    attributes: List[:class:`str`]
-            The List that contains all the Attributes the user / player has gained while using the
-            :class:`Story` Object.
-    text: List[:class:`str`]
-            The List containing every line of text in the sus file that isn't a comment / empty line
+    storage: MutableMapping[:class:`str`, Any]
+            The values stored by the ``STORAGE`` function, the ``attributes`` slot holds the
+            :class:`Attributes` the user / player has gained while using the :class:`Story` Object.
+            It's a :class:`Storage` by default but any dict-like object works.
+    text: Tuple[:class:`str`, ...]
+            The Tuple containing every line of text in the sus file that isn't a comment / empty line
     ended: :class:`bool`
             A Boolean representing if the story has ended or not.
+    rng: :class:`random.Random`
+            The random number generator used by the ``RANDOM`` and ``UTILS RAND`` functions, the
+            :mod:`random` module by default.
 
     Example
     -----------
@@ -109,145 +208,213 @@ class Story:
             Story("story").start()
     """
 
+    # The SUS function names and the names of the methods that implement them, every class gets its
+    # own table so subclasses can override them, see ``__init_subclass__``.
+    _builtin_function_names: Dict[str, str] = {  # Core part of the SUScript magic.
+        # ----- Normal Functions -----
+        "OPTION": "_option_function",
+        "JUMP": "_jump_function",
+        "STAY": "_stay_function",
+        "TAG": "_stay_function",
+        "STORY": "_story_function",
+        "END": "_end_function",
+        "SKIP": "_skip_function",
+        "RETURN": "_return_function",
+        "CHECKATTR": "_checkattr_function",
+        "CHECKANYATTR": "_checkanyattr_function",
+        "ADDATTR": "_addattr_function",
+        "DELATTR": "_delattr_function",
+        "RANDOM": "_random_function",
+        "STORAGE": "_storage_function",
+        "UTILS": "_utils_function",
+        # ----- Inline functions -----
+        "NEWLINE": "_newline_inline",
+    }
+    _builtin_dispatch: Mapping[str, _Dispatch]
+    _storage_unmodifiable: Tuple[str, ...] = ("attributes",)
+    # The random number generator of the RANDOM and UTILS RAND functions, it's the random module
+    # itself by default so random.seed still works, replace it with a random.Random to change that.
+    rng: Any = random
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._builtin_dispatch = _function_table(cls)
+
     def __init__(
         self,
-        reference: str,
+        reference: Union[str, Script],
         io_function: IoFunction = _story_io,
     ):
         # Defining some base stuff.
-        # Making sure that if the reference isn't source code that it ends with the correct file format.
-        # Refractored in v0.3a because the line was too long.
-        if not (reference.endswith(".sus") or len(reference.splitlines()) > 1):
-            self.reference = reference + ".sus"
+        if isinstance(reference, Script):
+            # Reusing an already parsed script, this is what makes creating a Story cheap.
+            self.script = reference
+            self.reference = reference.reference
         else:
-            self.reference = reference
+            self.reference = self._resolve_reference(reference)
+            self.script = self._load_script(self.reference)
         self.io = io_function
         self.line = 0
-        self.sub_story = str()
-        self.function_dict = {  # Core part of the SUScript magic.
-            # ----- Normal Functions -----
-            "OPTION": self._option_function,
-            "JUMP": self._jump_function,
-            "STAY": self._stay_function,
-            "TAG": self._stay_function,
-            "STORY": self._story_function,
-            "END": self._end_function,
-            "SKIP": self._skip_function,
-            "RETURN": self._return_function,
-            "CHECKATTR": self._checkattr_function,
-            "CHECKANYATTR": self._checkanyattr_function,
-            "ADDATTR": self._addattr_function,
-            "DELATTR": self._delattr_function,
-            "RANDOM": self._random_function,
-            "STORAGE": self._storage_function,
-            "UTILS": self._utils_function,
-            # ----- Inline functions -----
-            "NEWLINE": self._newline_inline,
-        }
-        self.tags: Dict[str, Tuple[str, int]] = dict()
-        self._storage_unmodifiable: List[str] = ["attributes"]
-        self.storage: Dict[str, Union[str, int, List[str]]] = {"attributes": []}
+        self.sub_story = self.script.first
+        # The function_dict is made on first use, until then the class's table is shared.
+        self._functions: Optional[Dict[str, Callable[..., Any]]] = None
+        self._dispatch_table: Mapping[str, _Dispatch] = self._builtin_dispatch
+        # The names of the functions, the function_dict once it's made.
+        self._known: Mapping[str, Any] = self._builtin_dispatch
+        self.storage = self._new_storage()
         self.ended = False
-        temp_text = self._get_text()  # Getting the story's raw text.
-        self.text: List[str] = list()
-        temp_lines = str()
-        # Processing the raw text, disregarding comments and empty lines and merging function ones.
-        for i in temp_text.splitlines():
-            if i and not i.startswith("# "):
-                if i.startswith("-") and "{{" in i:
-                    temp_lines = i.replace("{{", "")
-                    if "}}" in i:
-                        temp_lines = temp_lines.replace("}}", "")
-                        self.text.append(temp_lines.strip())
-                        temp_lines = str()
-                    continue
-                if temp_lines:
-                    if "}}" in i:
-                        temp_lines += i.replace("}}", "")
-                        self.text.append(temp_lines.strip())
-                        temp_lines = str()
-                        continue
-                    temp_lines += i
-                    continue
-                self.text.append(
-                    i.strip()
-                )  # Making sure that there's no padding in the lines.
-        if not self.text:
-            raise StoryError(
-                "Story file is empty"
-            )  # Raising an error if the story is empty / all comments.
-        # Checking if the story has any Sub stories, if not it raises an error.
-        if all(findall(r"\[STORY ([a-zA-Z0-9-]+?)\]", i) == [] for i in self.text):
-            raise StoryError("No Story sections found")
-        self.sub_stories: Dict[str, List[str]] = dict()
-        temp_list: List[str] = list()
-        # Marking Sub-stories with their text and setting the Tags' location.
-        for i in self.text:
-            sub_story = findall(r"\[STORY ([a-zA-Z0-9-]+?)\]", i)
-            if sub_story:
-                if temp_list:
-                    self.sub_stories[temp_list[0]] = temp_list[1:]
-                    temp_list.clear()
-                if not self.sub_story:
-                    self.sub_story = sub_story[0]
-                if sub_story[0] in self.sub_stories:
-                    raise StoryError(f"Duplicate 'Sub-story': {sub_story}")
-                temp_list = [sub_story[0]]
-                continue
-            if i.startswith(("-TAG", "- TAG")):
-                if i.startswith("- "):
-                    i = "-" + i[2:]
-                tag = i.split(" ", 2)[1]
-                # Raising an error if there's a duplicate Tag name.
-                if tag in self.tags:
-                    raise StoryError(f"Duplicate Tag: {tag}")
-                self.tags[tag] = (temp_list[0], len(temp_list) - 1)
-            temp_list.append(i)
-        if temp_list:
-            self.sub_stories[temp_list[0]] = temp_list[1:]
-            temp_list.clear()
-
-    def _get_text(self) -> str:  # The function to get the raw text
+
+    @property
+    def function_dict(self) -> Dict[str, Callable[..., Any]]:
+        if self._functions is None:
+            self.function_dict = {
+                name: getattr(self, attr)
+                for name, attr in self._builtin_function_names.items()
+            }
+        assert self._functions is not None
+        return self._functions
+
+    @function_dict.setter
+    def function_dict(self, functions: Dict[str, Callable[..., Any]]) -> None:
+        self._functions = self._known = functions
+        self._dispatch_table = {name: _dispatch(i) for name, i in functions.items()}
+
+    @property
+    def storage(self) -> MutableMapping[str, Any]:
+        return self._storage
+
+    @storage.setter
+    def storage(self, storage: MutableMapping[str, Any]) -> None:
+        # A Storage is read and written by the slots its variables got when parsing, anything else
+        # by name. The arguments resolved with the script's slots are shared by its stories.
+        self._storage = storage
+        self._slotted: Optional[Storage] = None
+        slots = _NO_SLOTS
+        if isinstance(storage, Storage):
+            self._slotted, slots = storage, storage.slots
+        self._slots = slots
+        script = self.script
+        if slots is script.slots:
+            self._commands, self._expressions = script._commands, script._expressions
+        else:
+            self._commands, self._expressions = dict(), dict()
+
+    @property
+    def text(self) -> Tuple[str, ...]:
+        """Every line of text in the sus file that isn't a comment / empty line."""
+        return self.script.text
+
+    @property
+    def sub_stories(self) -> Mapping[str, Tuple[str, ...]]:
+        """The Sub-stories and their lines."""
+        return self.script.sub_stories
+
+    @property
+    def tags(self) -> Mapping[str, Tuple[str, int]]:
+        """The Tags and the Sub-story and line they're in."""
+        return self.script.tags
+
+    @classmethod
+    async def aload(
+        cls: Type[StoryT], reference: str, io_function: IoFunction = _story_io
+    ) -> StoryT:
+        """Asynchronously loads a story without blocking the event loop.
+
+        .. versionadded:: 1.0.0
+
+        The story is read and parsed in the event loop's default executor, concurrent loads of the
+        same reference share the same load.
+
+        Parameters
+        -----------
+        reference: :class:`str`
+                The reference of the story, same as the :class:`Story` constructor.
+        io_function: :class:`IoFunction`
+                The I/O function of the created :class:`Story`.
+
+        Example
+        -----------
+        .. code-block:: python3
+
+                story = await Story.aload("story")
+                await story.astart()
+        """
+        reference = cls._resolve_reference(reference)
+        loop = get_running_loop()
+        key = (loop, cls, reference)
+        future = _loading.get(key)
+        if future is None:
+            future = loop.run_in_executor(None, cls._load_script, reference)
+            _loading[key] = future
+            future.add_done_callback(lambda _: _loading.pop(key, None))
+        # Shielding it so one of the loaders being cancelled doesn't cancel the others.
+        return cls(await shield(future), io_function)
+
+    @classmethod
+    def _resolve_reference(cls, reference: str) -> str:
+        # Making sure that if the reference isn't source code that it ends with the correct file format.
+        # Refractored in v0.3a because the line was too long.
+        if not (reference.endswith(".sus") or len(reference.splitlines()) > 1):
+            return reference + ".sus"
+        return reference
+
+    @classmethod
+    def _load_script(cls, reference: str) -> Script:  # The function to get the parsed script
         # Checking if the reference is more than one line long, if so it treats it as the raw text instead
         # of getting a file with its name.
-        if len(self.reference.splitlines()) > 1:
-            temp_text = self.reference
-        else:
-            with open(self.reference, "r", encoding="UTF-8") as sf:
-                temp_text = sf.read()
-        return temp_text
-
-    async def _run(
-        self, args: str
-    ) -> Any:  # The function that runs SUScript functions.
-        arg_list = args.split(" ", 1)  # Splitting its args.
-        if (
-            not arg_list[0] in self.function_dict
-        ):  # Checking if the function exists, else raises an error.
-            raise StoryError(f"Unknown function: {arg_list[0]}")
-        func = self.function_dict[arg_list[0]]
-        if func.__code__.co_argcount == 1:  # Checking if the function has arguments.
-            if ismethod(func):  # Checking if its a method or a custom function.
-                ret = await func()
-            else:
-                ret = await func(self)
-        elif func.__code__.co_argcount == 2:  # Same thing.
-            if ismethod(func):  # Same thing.
-                ret = await func(arg_list[1])
-            else:
-                ret = await func(self, arg_list[1])
+        if len(reference.splitlines()) > 1:
+            return Script(reference, reference)
+        return load_script(reference)
+
+    def _call(self, args: Union[str, Call]) -> Any:  # The function that runs SUScript functions.
+        # Functions that don't need to wait for anything are just called, the ones that do return
+        # an awaitable which is passed on until something awaits it.
+        call = parse_call(args) if isinstance(args, str) else args  # Splitting its args.
+        func, pass_story, takes_args = self._entry(call.name)
+        if takes_args is False:  # Checking if the function has arguments.
+            ret = func(self) if pass_story else func()
+        elif takes_args:
+            if call.args is None:
+                raise StoryError(f"Missing arguments for function: {call.name}")
+            ret = func(self, call.args) if pass_story else func(call.args)
         else:  # Raising an error if the function takes too few or too many parameters.
-            raise StoryError("Invalid parameters for function: {arg_list[0]}")
+            raise StoryError(f"Invalid parameters for function: {call.name}")
         return ret if ret is not None else ""
 
+    def _value(self, args: Union[str, Call]) -> Any:
+        # Like _call but for functions whose result is used, awaiting it gives "" instead of None.
+        ret = self._call(args)
+        return _settle(ret) if _pending(ret) else ret
+
+    async def _run(self, args: Union[str, Call]) -> Any:
+        ret = self._value(args)
+        return await ret if _pending(ret) else ret
+
+    def _entry(self, name: str) -> _Dispatch:
+        entry = self._dispatch_table.get(name)
+        functions = self._functions
+        if entry is None or (functions is not None and entry.function is not functions.get(name)):
+            # The function was set in (or removed from) the function_dict directly.
+            if functions is None or name not in functions:
+                raise StoryError(f"Unknown function: {name}")
+            entry = _dispatch(functions[name])
+            self._dispatch_table[name] = entry  # type: ignore[index]
+        return entry
+
+    def _is_builtin(self, name: str, function: Callable[..., Any]) -> bool:
+        entry = self._entry(name) if name in self._known else None
+        # The function_dict has the built-in functions bound to the story.
+        return entry is not None and getattr(entry.function, "__func__", entry.function) is function
+
     # ----- Normal Functions -----
+    # Only the functions that use the I/O function are coroutines, the others return an awaitable
+    # only when a function they run does.
 
     async def _option_function(self, args: str) -> None:
-        option_functions = [i[0].strip() for i in findall(r"\$\$(.+?)(,|$)", args)]
+        option_titles, option_functions = parse_options(args)
         for i in option_functions:
-            if i.split()[0] not in self.function_dict:
-                raise StoryError(f"Invalid function {i.split()[0]} in Option")
-        option_titles = [i[1].strip() for i in findall(r"(,|^)(.+?)\$\$", args)]
+            if i.name not in self._known:
+                raise StoryError(f"Invalid function {i.name} in Option")
         while True:
             option = await self.io(options=option_titles)
             option = option.strip()
@@ -261,298 +428,291 @@ class Story:
                     await self.io(error="Invalid option, try again")
                     continue
                 option_function = option_functions[option_titles.index(option)]
-            await self._run(option_function)
+            ret = self._call(option_function)
+            if _pending(ret):
+                await ret
             break
 
-    async def _jump_function(self, args: str) -> None:
+    def _jump_function(self, args: str) -> None:
         if args.strip() not in self.tags:
             raise StoryError(f"Tag {args.strip()} doesn't exist.")
         tag = self.tags[args.strip()]
         self.sub_story = tag[0]
         self.line = tag[1]
 
-    async def _stay_function(self) -> None:
-        if self.line + 1 >= len(self.sub_stories[self.sub_story]):
-            sub_stories = list(self.sub_stories.keys())
-            story_index = sub_stories.index(self.sub_story)
-            if story_index + 1 >= len(sub_stories):
-                await self.end()
-            else:
-                self.sub_story = sub_stories[story_index + 1]
-                self.line = 0
+    def _stay_function(self) -> Any:
+        if self.line + 1 >= len(self.script.code[self.sub_story]):
+            following = self.script.successors[self.sub_story]
+            if following is None:
+                return self.end()
+            self.sub_story = following
+            self.line = 0
         else:
             self.line += 1
+        return None
 
-    async def _story_function(self, args: str) -> None:
+    def _story_function(self, args: str) -> None:
         if args.strip() not in self.sub_stories:
             raise StoryError(f"Sub-story {args.strip()} doesn't exist.")
         self.sub_story = args.strip()
         self.line = 0
 
-    async def _end_function(self) -> None:
-        await self.end()
+    def _end_function(self) -> Any:
+        return self.end()
 
-    async def _skip_function(self, args: str) -> None:
+    def _skip_function(self, args: str) -> Any:
         if not args.strip().isdigit():
-            raise StoryError(f"SKIP argument should be a number not {args.strip}")
+            raise StoryError(f"SKIP argument should be a number not {args.strip()}")
         lines = int(args.strip())
         if lines <= 0:
             raise StoryError("Amount of lines to skip must be positive.")
-        for _ in range(lines + 1):
-            await self._stay_function()
-
-    async def _return_function(self, args: str) -> None:
+        line = self.line + lines + 1
+        if line < len(self.script.code[self.sub_story]):
+            self.line = line
+            return None
+        # Skipping past the end of the Sub-story into the ones after it.
+        location = self.script.locate(self.script.offsets[self.sub_story] + line)
+        if location is None:
+            return self.end()
+        self.sub_story, self.line = location
+        return None
+
+    def _return_function(self, args: str) -> None:
         if not args.strip().isdigit():
-            raise StoryError(f"RETURN argument should be a number not {args.strip}")
+            raise StoryError(f"RETURN argument should be a number not {args.strip()}")
         lines = int(args.strip())
         if lines <= 0:
             raise StoryError("Amount of lines to return must be positive.")
         self.line = max(0, self.line - lines)
 
-    async def _checkattr_function(self, args: str) -> None:
-        attr, function = args.split("$$", 1)
-        attr_list = split("&&|,| ", attr)
-        for i in attr_list:
-            if not i:
-                continue
-            i = i.strip()
-            attributes = self.storage["attributes"]
-            assert isinstance(attributes, list), "Attributes isn't a list"
-            if i.startswith("!!"):
-                if i[3:] in attributes:
-                    return
-            else:
-                if i not in attributes:
-                    return
-        await self._run(function)
-
-    async def _checkanyattr_function(self, args: str) -> None:
-        attr, function = args.split("$$", 1)
-        attr_list = split("&&|,| ", attr)
-        for i in attr_list:
-            if not i:
-                continue
-            i = i.strip()
-            attributes = self.storage["attributes"]
-            assert isinstance(attributes, list), "Attributes isn't a list"
-            if i.startswith("!!"):
-                if i[3:] not in attributes:
-                    await self._run(function)
-            else:
-                if i in attributes:
-                    await self._run(function)
-
-    async def _addattr_function(self, args: str) -> None:
-        arg_list = split("&&|,| ", args)
-        for arg in arg_list:
-            arg = arg.strip()
-            attributes = self.storage["attributes"]
-            assert isinstance(attributes, list), "Attributes isn't a list"
-            if arg and arg not in attributes:
-                attributes.append(arg)
-
-    async def _delattr_function(self, args: str) -> None:
-        arg_list = split("&&|,| ", args)
-        for arg in arg_list:
-            arg = arg.strip()
-            attributes = self.storage["attributes"]
-            assert isinstance(attributes, list), "Attributes isn't a list"
-            if arg and arg in attributes:
-                attributes.remove(arg)
-
-    async def _random_function(self, args: str) -> None:
-        funcs = args.split(",")
-        await self._run(choice(funcs).strip())
-
-    async def _storage_function(self, args: str) -> Any:
-        sub_func, args = args.split(" ", 1)
-        if sub_func == "SET":
-            label, value = args.split(" ", 1)
-            if value.startswith("$$"):
-                value = await self._run(value[2:])
-            self.storage[label.strip()] = int(value) if str(value).isdigit() else value
-            return self.storage[label.strip()]
-        elif sub_func == "GET":
-            if args in self.storage:
-                return self.storage[args.strip()]
-            return 0
-        raise StoryError(f"Unknown Function: {sub_func}")
-
-    async def _utils_function(self, args: str) -> Any:
-        sub_func, args = args.split(" ", 1)
-        if sub_func == "SAY":
-            await self.io(args)
-        elif sub_func == "IS":
-            # There must be a better way to do this.
-            arg_list = args.split("$$")
-            func = arg_list[-1]
-            var1, var2 = "".join(arg_list[:-1]).split(",", 1)
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            else:
-                var1 = int(var1) if var1.isdigit() else var1
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            else:
-                var2 = int(var2) if var2.isdigit() else var2
-            if var1 == var2:
-                await self._run(func)
-        elif sub_func == "ISNOT":
-            arg_list = args.split("$$")
-            func = arg_list[-1]
-            var1, var2 = "".join(arg_list[:-1]).split(",", 1)
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            else:
-                var1 = int(var1) if var1.isdigit() else var1
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            else:
-                var2 = int(var2) if var2.isdigit() else var2
-            if var1 != var2:
-                await self._run(func)
-        elif sub_func == "GREATER":
-            arg_list = args.split("$$")
-            func = arg_list[-1]
-            var1, var2 = "".join(arg_list[:-1]).split(",", 1)
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit() or not str(var2).isdigit():
-                raise StoryError("Both values must be numbers in comparison")
-            if int(var1) > int(var2):
-                await self._run(func)
-        elif sub_func == "SMALLER":
-            arg_list = args.split("$$")
-            func = arg_list[-1]
-            var1, var2 = "".join(arg_list[:-1]).split(",", 1)
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit() or not str(var2).isdigit():
-                raise StoryError("Both values must be numbers in comparison")
-            if int(var1) < int(var2):
-                await self._run(func)
-        elif sub_func == "ADD":
-            arg_list = args.split(",")
-            var1, var2 = ",".join(arg_list[:-1]), arg_list[-1]
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 1: {var1}. Both values must be numbers in operations"
-                )
-            if not str(var2).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 2: {var2}. Both values must be numbers in operations"
-                )
-            return int(var1) + int(var2)
-        elif sub_func in ["SUB", "SUBTRACT"]:
-            arg_list = args.split(",")
-            var1, var2 = ",".join(arg_list[:-1]), arg_list[-1]
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 1: {var1}. Both values must be numbers in operations"
-                )
-            if not str(var2).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 2: {var2}. Both values must be numbers in operations"
-                )
-            return int(var1) - int(var2)
-        elif sub_func in ["MULT", "MULTIPLY"]:
-            arg_list = args.split(",")
-            var1, var2 = ",".join(arg_list[:-1]), arg_list[-1]
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 1: {var1}. Both values must be numbers in operations"
-                )
-            if not str(var2).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 2: {var2}. Both values must be numbers in operations"
-                )
-            return round(int(var1) * int(var2))
-        elif sub_func in ["DIV", "DIVIDE"]:
-            arg_list = args.split(",")
-            var1, var2 = ",".join(arg_list[:-1]), arg_list[-1]
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 1: {var1}. Both values must be numbers in operations"
-                )
-            if not str(var2).isdigit():
-                raise StoryError(
-                    f"Error in {sub_func}, var 2: {var2}. Both values must be numbers in operations"
-                )
-            return round(int(var1) / int(var2))
-        elif sub_func in ["RAND", "RANDOM"]:
-            arg_list = args.split(",")
-            var1, var2 = ",".join(arg_list[:-1]), arg_list[-1]
-            var1, var2 = var1.strip(), var2.strip()
-            if var1.split()[0] in self.function_dict:
-                var1 = await self._run(var1)
-            if var2.split()[0] in self.function_dict:
-                var2 = await self._run(var2)
-            if not str(var1).isdigit() or not str(var2).isdigit():
-                raise StoryError("Both values must be numbers in random ranges")
-            return randrange(int(var1), int(var2))
-        elif sub_func == "INPUT":
-            res = await self.io(args + "\n> ")
-            return int(res) if res.isdigit() else res
+    def _checkattr_function(self, args: str) -> Any:
+        check = parse_attribute_check(args)
+        attributes = self._attributes().view()
+        if attributes >= check.required and attributes.isdisjoint(check.forbidden):
+            return _discard(self._call(check.call))
+        return None
+
+    def _checkanyattr_function(self, args: str) -> Any:
+        check = parse_attribute_check(args)
+        attributes = self._attributes().view()
+        if not attributes.isdisjoint(check.required) or not attributes >= check.forbidden:
+            return _discard(self._call(check.call))
+        return None
+
+    def _addattr_function(self, args: str) -> None:
+        self._attributes().update(parse_attributes(args))
+
+    def _delattr_function(self, args: str) -> None:
+        attributes = self._attributes()
+        for arg in parse_attributes(args):
+            attributes.discard(arg)
+
+    def _random_function(self, args: str) -> Any:
+        return _discard(self._call(self.rng.choice(parse_choices(args))))
+
+    def _storage_function(self, args: str) -> Any:
+        command = self._commands.get(args)
+        if command is None:
+            command = _remember(
+                self._commands, args, resolve(parse_storage(args), self._slots)
+            )
+        storage = self._slotted
+        if isinstance(command, Lookup):
+            if command.slot < 0 or storage is None:
+                return self._storage.get(command.key, 0)
+            return storage.load(command.slot, 0)
+        if command.call is None:
+            value = command.value
         else:
-            raise StoryError(f"Unknown Function: {sub_func}")
+            value = self._value(command.call)
+            if _pending(value):
+                return self._store_later(command, value)
+            if isinstance(value, str):
+                value = literal(value)
+        if command.slot < 0 or storage is None:
+            self._storage[command.key] = value
+        else:
+            storage.store(command.slot, value)
+        return value
+
+    async def _store_later(self, command: Assign, value: Awaitable[Any]) -> Any:
+        result = await value
+        if isinstance(result, str):
+            result = literal(result)
+        storage = self._slotted
+        if command.slot < 0 or storage is None:
+            self._storage[command.key] = result
+        else:
+            storage.store(command.slot, result)
+        return result
+
+    def _utils_function(self, args: str) -> Any:
+        sub_func, text = args.split(" ", 1)
+        if sub_func == "SAY":
+            return _discard(self.io(text))
+        if sub_func == "INPUT":
+            return self._input(text)
+        expression = self._expressions.get(args)
+        if expression is None:
+            expression = _remember(
+                self._expressions, args, resolve(parse_utils(sub_func, text), self._slots)
+            )
+        if isinstance(expression, Comparison):
+            left = self._evaluate(expression.left)
+            if _pending(left):
+                return self._compare_later(expression, left)
+            right = self._evaluate(expression.right)
+            if _pending(right):
+                return self._compare_later(expression, left, right)
+            if compare(expression.op, left, right):
+                return _discard(self._call(expression.call))
+            return None
+        return self._evaluate(expression)
+
+    async def _input(self, text: str) -> Any:
+        res = await self.io(text + "\n> ")
+        return int(res) if res.isdigit() else res
+
+    async def _compare_later(
+        self, expression: Comparison, left: Any, right: Any = _UNSET
+    ) -> None:
+        if _pending(left):
+            left = await left
+        if right is _UNSET:
+            right = self._evaluate(expression.right)
+        if _pending(right):
+            right = await right
+        if compare(expression.op, left, right):
+            ret = self._call(expression.call)
+            if _pending(ret):
+                await ret
+
+    def _inline(self, call: Call) -> Any:
+        # STORAGE GET and UTILS arithmetic in story lines are evaluated without running them.
+        expression = self._expressions.get(call, _UNSET)
+        if expression is _UNSET:
+            expression = _remember(
+                self._expressions, call, resolve(parse_inline(call), self._slots)
+            )
+        if expression is None:
+            return self._value(call)
+        return self._evaluate(expression)
+
+    def _evaluate(self, expression: Expression) -> Any:
+        # Evaluating a parsed UTILS operand, STORAGE GET and nested UTILS operations don't go
+        # through _value unless they were replaced by custom functions.
+        if isinstance(expression, Value):
+            return expression.value
+        if isinstance(expression, Lookup):
+            if self._is_builtin("STORAGE", Story._storage_function):
+                storage = self._slotted
+                if expression.slot < 0 or storage is None:
+                    return self._storage.get(expression.key, 0)
+                return storage.load(expression.slot, 0)
+            return self._value(expression.call)
+        if isinstance(expression, Invoke):
+            if expression.call.name in self._known:
+                return self._value(expression.call)
+            return expression.text
+        if not self._is_builtin("UTILS", Story._utils_function):
+            return self._value(expression.call)
+        left = self._evaluate(expression.left)
+        if _pending(left):
+            return self._evaluate_later(expression, left)
+        right = self._evaluate(expression.right)
+        if _pending(right):
+            return self._evaluate_later(expression, left, right)
+        return calculate(expression.op, left, right, self.rng)
+
+    async def _evaluate_later(
+        self, expression: Operation, left: Any, right: Any = _UNSET
+    ) -> Any:
+        if _pending(left):
+            left = await left
+        if right is _UNSET:
+            right = self._evaluate(expression.right)
+        if _pending(right):
+            right = await right
+        return calculate(expression.op, left, right, self.rng)
 
     # ----- Inline Functions -----
 
-    async def _newline_inline(self) -> str:
+    def _newline_inline(self) -> str:
         return "\n"
 
     # ----- Internal Functions -----
 
-    async def _run_line(self, line: str=None) -> None:
-        curr_line = self.sub_stories[self.sub_story][self.line] if line is None else line
-        if not any(
-            (curr_line.startswith((f"-{i}", f"- {i}"))) for i in self.function_dict
-        ):
-            inlines = findall("{{.+?}}", curr_line)
-            if inlines:
-                curr_line = sub("{{.+?}}", "{}", curr_line)
-                await self.io(
-                    curr_line.format(*[await self._run(i[2:-2]) for i in inlines])
-                )
-            else:
-                await self.io(curr_line)
-            if line is None:
-                await self._stay_function()
-        else:
-            temp_line = self.line
-            if curr_line.startswith("- "):
-                curr_line = "-" + curr_line[2:]
-            await self._run(curr_line[1:])
-            if temp_line == self.line and line is None:
-                await self._stay_function()
+    def _new_storage(self, attributes: Optional[Attributes] = None) -> Storage:
+        storage = Storage(self.script.slots)
+        storage["attributes"] = Attributes() if attributes is None else attributes
+        return storage
+
+    def _attributes(self) -> Attributes:
+        attributes = self._storage["attributes"]
+        if not isinstance(attributes, Attributes):
+            # Someone replaced the attributes with a plain list.
+            attributes = self._storage["attributes"] = Attributes(attributes)  # type: ignore
+        return attributes
+
+    def _step(self, line: Optional[str] = None) -> Optional[Awaitable[None]]:
+        # Runs a line, returning an awaitable that finishes it only if it has to wait for something
+        # (usually the I/O function), lines of pure logic never make a coroutine.
+        curr_line = self.script.code[self.sub_story][self.line] if line is None else compile_line(line)
+        if isinstance(curr_line, Command):
+            if curr_line.call.name in self._known:
+                temp_line = self.line
+                ret = self._call(curr_line.call)
+                if _pending(ret):
+                    return self._finish_command(ret, temp_line, line)
+                if temp_line == self.line and line is None and not self.ended:
+                    stay = self._stay_function()
+                    return stay if _pending(stay) else None
+                return None
+            # Lines that start with "-" but don't call a function are just story lines.
+            curr_line = parse_text(curr_line.source)
+        if curr_line.inlines:
+            segments = curr_line.segments
+            parts = [segments[0]]
+            for i, call in enumerate(curr_line.inlines):
+                value = self._inline(call)
+                if _pending(value):
+                    return self._finish_text(curr_line, parts, i, value, line)
+                parts.append(str(value))
+                parts.append(segments[i + 1])
+            return self._say("".join(parts), line is None)
+        return self._say(curr_line.source, line is None)
+
+    async def _finish_command(
+        self, ret: Awaitable[Any], temp_line: int, line: Optional[str]
+    ) -> None:
+        await ret
+        if temp_line == self.line and line is None and not self.ended:
+            stay = self._stay_function()
+            if _pending(stay):
+                await stay
+
+    async def _finish_text(
+        self, text: Text, parts: List[str], index: int, value: Any, line: Optional[str]
+    ) -> None:
+        # The rest of a story line once one of its inline functions had to wait.
+        for i in range(index, len(text.inlines)):
+            if i != index:
+                value = self._inline(text.inlines[i])
+            parts.append(str(await value if _pending(value) else value))
+            parts.append(text.segments[i + 1])
+        await self._say("".join(parts), line is None)
+
+    async def _say(self, text: str, stay: bool) -> None:
+        await self.io(text)
+        if stay:
+            ret = self._stay_function()
+            if _pending(ret):
+                await ret
+
+    async def _run_line(self, line: Optional[str] = None) -> None:
+        ret = self._step(line)
+        if ret is not None:
+            await ret
 
     def start(self) -> None:
         """The non asynchronous method called to start the story / game of the corresponding :class:`Story` object"""
@@ -561,7 +721,9 @@ class Story:
     async def astart(self) -> None:
         """The method called to start the story / game of the corresponding :class:`Story` object"""
         while not self.ended:
-            await self._run_line()
+            ret = self._step()
+            if ret is not None:
+                await ret
 
     async def end(self) -> None:
         """The method called when the :class:`Story` object reaches an end by either hitting
@@ -573,13 +735,82 @@ class Story:
         )
         if answer.lower().strip() in ["yes", "y"]:
             self.line = 0
-            self.sub_story = list(self.sub_stories.keys())[0]
-            self.storage = {"attributes": []}
-            system("cls" if name == "nt" else "clear")
+            self.sub_story = self.script.first
+            self.storage = self._new_storage()
+            if isinstance(self.io, TerminalIO):  # Only clearing the screen in the terminal.
+                system("cls" if name == "nt" else "clear")
         else:
             await self.io(error="Alright, See you next time!")
             self.ended = True
 
+    def snapshot(self, as_json: bool = False) -> Union[bytes, str]:
+        """Saves the state of the :class:`Story` object so it can be resumed later with :meth:`restore`.
+
+        .. versionadded:: 1.0.0
+
+        Only the current line, storage, attributes and whether it ended are saved along with a hash
+        of the :class:`Script`, so a snapshot is usually less than a hundred bytes.
+
+        Parameters
+        -----------
+        as_json: :class:`bool`
+                Whether to return the snapshot as json text instead of bytes.
+        """
+        storage = {k: v for k, v in self.storage.items() if k != "attributes"}
+        state = State(
+            self.sub_story, self.line, self.ended, storage, list(self._attributes())
+        )
+        return dump(state, self.script.digest, as_json)
+
+    def restore(self, snapshot: Union[bytes, str]) -> None:
+        """Loads a snapshot made by :meth:`snapshot`.
+
+        .. versionadded:: 1.0.0
+
+        Raises
+        -----------
+        StoryError
+                The snapshot is invalid or was made with a different :class:`Script`.
+        """
+        digest, state = load(snapshot)
+        if digest != self.script.digest[:8]:
+            raise StoryError("Snapshot was made with a different script")
+        if state.sub_story not in self.script.code:
+            raise StoryError(f"Sub-story {state.sub_story} doesn't exist.")
+        if type(state.line) is not int or not 0 <= state.line < len(
+            self.script.code[state.sub_story]
+        ):
+            raise StoryError(f"Line {state.line} doesn't exist in {state.sub_story}.")
+        storage = self._new_storage(Attributes(state.attributes))
+        storage.update(state.storage)
+        self.sub_story = state.sub_story
+        self.line = state.line
+        self.ended = state.ended
+        self.storage = storage
+
+    @classmethod
+    def from_snapshot(
+        cls: Type[StoryT],
+        script: Script,
+        snapshot: Union[bytes, str],
+        io_function: IoFunction = _story_io,
+    ) -> StoryT:
+        """Makes a :class:`Story` object from a shared :class:`Script` and a snapshot.
+
+        .. versionadded:: 1.0.0
+
+        Example
+        -----------
+        .. code-block:: python3
+
+                data = story.snapshot()
+                del story  # The player went idle.
+                story = Story.from_snapshot(script, data, io_function)
+        """
+        story = cls(script, io_function)
+        story.restore(snapshot)
+        return story
+
     def io_function(
         self, function: Callable[[str, Union[str, Iterable[str]]], str]
     ) -> Callable[[str, Union[str, Iterable[str]]], str]:
@@ -624,6 +855,10 @@ class Story:
 
         .. versionadded:: 0.1.6
 
+        The function can be a coroutine function or a normal one, normal functions are just called
+        so functions that never wait for anything (eg: don't use the I/O function) are faster as
+        normal ones.
+
         Parameters
         -----------
         name: :class:`str
@@ -633,9 +868,14 @@ class Story:
         name = name.strip().upper()
 
         def inner(function: Callable[..., Any]) -> Callable[..., Any]:
-            if name in self.function_dict:
+            functions = self.function_dict
+            if name in functions:
                 raise StoryError(f"Duplicate function: {name}")
-            self.function_dict[name] = function
+            functions[name] = function
+            self._entry(name)
             return function
 
         return inner
+
+
+Story._builtin_dispatch = _function_table(Story)
@@ -0,0 +1,47 @@
+"""
+Tests for parsing sus files with Script and LazyScript.
+"""
+
+import pytest
+
+from psup import LazyScript, Script, StoryError
+
+PREAMBLE = (
+    "A title line\n"
+    "Some words before the story.\n"
+    "- STORAGE SET x 1\n"
+    "- TAG intro\n"
+    "[STORY main]\n"
+    "- TAG top\n"
+    "Hello {{STORAGE GET x}}\n"
+    "- JUMP intro\n"
+    "[STORY other]\n"
+    "Bye.\n"
+)
+
+
+def load_both(tmp_path, source):
+    path = tmp_path / "story.sus"
+    path.write_bytes(source.encode("UTF-8"))
+    return Script(source, str(path)), LazyScript(str(path), max_sections=1)
+
+
+def test_lazy_script_matches_script_with_preamble(tmp_path):
+    script, lazy = load_both(tmp_path, PREAMBLE)
+    assert lazy.first == script.first == "main"
+    assert list(lazy.code) == list(script.code)
+    assert dict(lazy.sub_stories) == dict(script.sub_stories)
+    assert dict(lazy.code) == dict(script.code)
+    assert dict(lazy.tags) == dict(script.tags)
+    assert lazy.variables == script.variables
+    assert lazy.offsets == script.offsets
+    assert lazy.length == script.length
+    assert lazy.digest == script.digest
+
+
+@pytest.mark.parametrize("loader", [Script.from_file, LazyScript])
+def test_tag_before_first_sub_story(tmp_path, loader):
+    path = tmp_path / "story.sus"
+    path.write_text("- TAG early\n[STORY main]\nHello\n", encoding="UTF-8")
+    with pytest.raises(StoryError):
+        loader(str(path))